@@ -1,6 +1,6 @@
-import { spawn } from "child_process";
 import path from "path";
 import { fileURLToPath } from "url";
+import { PythonWorkerPool } from "./pythonWorker";
 
 const __filename = fileURLToPath(import.meta.url);
 const __dirname = path.dirname(__filename);
@@ -46,48 +46,18 @@ export interface NameNormalizeResult {
 const SCRIPT_PATH = path.join(__dirname, "../python/address_parser.py");
 const TIMEOUT_MS = 10000;
 
-function runPythonScript(args: string[]): Promise<string> {
-  return new Promise((resolve, reject) => {
-    console.log(`[AddressParser] Running: python3 ${SCRIPT_PATH} ${args[0]} ...`);
-    
-    const process = spawn("python3", [SCRIPT_PATH, ...args], {
-      timeout: TIMEOUT_MS,
-    });
-
-    let stdout = "";
-    let stderr = "";
-
-    process.stdout.on("data", (data) => {
-      stdout += data.toString();
-    });
-
-    process.stderr.on("data", (data) => {
-      stderr += data.toString();
-    });
-
-    process.on("close", (code) => {
-      if (code !== 0) {
-        console.error(`[AddressParser] Process exited with code ${code}`);
-        console.error(`[AddressParser] stderr: ${stderr}`);
-        reject(new Error(`Process exited with code ${code}: ${stderr}`));
-        return;
-      }
-      resolve(stdout);
-    });
+const workers = new PythonWorkerPool(SCRIPT_PATH, "AddressParser", 2, TIMEOUT_MS);
 
-    process.on("error", (err) => {
-      console.error(`[AddressParser] Process error:`, err);
-      reject(err);
-    });
-  });
+function runPythonScript<T>(args: string[]): Promise<T> {
+  console.log(`[AddressParser] Running: ${args[0]} ...`);
+  return workers.run<T>(args);
 }
 
 export async function parseAddress(address: string): Promise<AddressParseResult> {
   console.log(`[AddressParser] Parsing address: ${address}`);
   
   try {
-    const output = await runPythonScript(["parse", address]);
-    const result = JSON.parse(output) as AddressParseResult;
+    const result = await runPythonScript<AddressParseResult>(["parse", address]);
     
     if (result.success && result.normalized) {
       console.log(`[AddressParser] Parsed: ${result.normalized.line1}, ${result.normalized.city}, ${result.normalized.stateCode}`);
@@ -108,12 +78,35 @@ export async function parseAddress(address: string): Promise<AddressParseResult>
   }
 }
 
+/**
+ * Parse many addresses with a single Python call. Results are in input order.
+ */
+export async function parseAddresses(addresses: string[]): Promise<AddressParseResult[]> {
+  if (addresses.length === 0) {
+    return [];
+  }
+
+  console.log(`[AddressParser] Parsing ${addresses.length} addresses`);
+
+  try {
+    return await runPythonScript<AddressParseResult[]>(["parse_many", JSON.stringify(addresses)]);
+  } catch (error) {
+    const errorMessage = error instanceof Error ? error.message : String(error);
+    console.error(`[AddressParser] Batch parse failed:`, errorMessage);
+    return addresses.map(() => ({
+      success: false,
+      error: errorMessage,
+      parsed: null,
+      normalized: null,
+    }));
+  }
+}
+
 export async function normalizeEntityName(name: string): Promise<NameNormalizeResult> {
   console.log(`[AddressParser] Normalizing name: ${name}`);
   
   try {
-    const output = await runPythonScript(["normalize_name", name]);
-    const result = JSON.parse(output) as NameNormalizeResult;
+    const result = await runPythonScript<NameNormalizeResult>(["normalize_name", name]);
     
     if (result.success) {
       console.log(`[AddressParser] Normalized name: ${result.normalized}`);
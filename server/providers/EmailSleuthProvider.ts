@@ -1,7 +1,7 @@
-import { spawn } from "child_process";
 import path from "path";
 import { fileURLToPath } from "url";
 import { trackProviderCall } from "../providerConfig";
+import { PythonWorkerPool } from "./pythonWorker";
 
 const __filename = fileURLToPath(import.meta.url);
 const __dirname = path.dirname(__filename);
@@ -33,40 +33,10 @@ export interface EmailDiscoveryResult {
 const SCRIPT_PATH = path.join(__dirname, "../python/email_sleuth.py");
 const TIMEOUT_MS = 30000;
 
-function runPythonScript(args: string[]): Promise<string> {
-  return new Promise((resolve, reject) => {
-    console.log(`[EmailSleuth] Running email discovery for: ${args[0]} @ ${args[1]}`);
-    
-    const proc = spawn("python3", [SCRIPT_PATH, ...args], {
-      timeout: TIMEOUT_MS,
-    });
-
-    let stdout = "";
-    let stderr = "";
-
-    proc.stdout.on("data", (data) => {
-      stdout += data.toString();
-    });
+const workers = new PythonWorkerPool(SCRIPT_PATH, "EmailSleuth", 4, TIMEOUT_MS);
 
-    proc.stderr.on("data", (data) => {
-      stderr += data.toString();
-    });
-
-    proc.on("close", (code) => {
-      if (code !== 0) {
-        console.error(`[EmailSleuth] Process exited with code ${code}`);
-        console.error(`[EmailSleuth] stderr: ${stderr}`);
-        reject(new Error(`Process exited with code ${code}: ${stderr}`));
-        return;
-      }
-      resolve(stdout);
-    });
-
-    proc.on("error", (err) => {
-      console.error(`[EmailSleuth] Process error:`, err);
-      reject(err);
-    });
-  });
+function runPythonScript<T>(args: string[], timeoutMs?: number): Promise<T> {
+  return workers.run<T>(args, timeoutMs);
 }
 
 /**
@@ -90,8 +60,7 @@ export async function discoverEmail(
       args.push("--no-verify");
     }
     
-    const output = await runPythonScript(args);
-    const result = JSON.parse(output) as EmailDiscoveryResult;
+    const result = await runPythonScript<EmailDiscoveryResult>(args);
     
     if (result.success) {
       trackProviderCall("email_sleuth", false);
@@ -146,23 +115,34 @@ export async function discoverEmailsBatch(
 ): Promise<EmailDiscoveryResult[]> {
   console.log(`[EmailSleuth] Batch discovering emails for ${contacts.length} contacts`);
   
-  const results: EmailDiscoveryResult[] = [];
+  if (contacts.length === 0) {
+    return [];
+  }
   
-  for (const contact of contacts) {
-    try {
-      const result = await discoverEmail(contact.name, contact.domain, verifySmtp);
-      results.push(result);
-    } catch (error) {
-      results.push({
-        success: false,
-        error: error instanceof Error ? error.message : String(error),
-        name: contact.name,
-        domain: contact.domain,
-      });
+  try {
+    // One worker request for the whole batch lets Python resolve every domain's MX records concurrently
+    const args = ["--batch", JSON.stringify(contacts.map((c) => [c.name, c.domain]))];
+    if (!verifySmtp) {
+      args.push("--no-verify");
     }
+    
+    const results = await runPythonScript<EmailDiscoveryResult[]>(args, TIMEOUT_MS * contacts.length);
+    for (const result of results) {
+      if (result.success) {
+        trackProviderCall("email_sleuth", false);
+      }
+    }
+    return results;
+  } catch (error) {
+    const errorMessage = error instanceof Error ? error.message : String(error);
+    console.error(`[EmailSleuth] Batch discovery error:`, errorMessage);
+    return contacts.map((contact) => ({
+      success: false,
+      error: errorMessage,
+      name: contact.name,
+      domain: contact.domain,
+    }));
   }
-  
-  return results;
 }
 
 export function isProviderAvailable(): boolean {
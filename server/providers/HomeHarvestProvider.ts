@@ -1,6 +1,6 @@
-import { spawn } from "child_process";
 import path from "path";
 import { fileURLToPath } from "url";
+import { PythonWorkerPool } from "./pythonWorker";
 
 const __filename = fileURLToPath(import.meta.url);
 const __dirname = path.dirname(__filename);
@@ -92,48 +92,18 @@ export interface HomeHarvestSearchResult {
 const SCRIPT_PATH = path.join(__dirname, "../python/homeharvest_lookup.py");
 const TIMEOUT_MS = 90000; // 90 seconds to allow for retry logic with exponential backoff
 
-function runPythonScript(args: string[]): Promise<string> {
-  return new Promise((resolve, reject) => {
-    console.log(`[HomeHarvest] Running: python3 ${SCRIPT_PATH} ${args.join(" ")}`);
-    
-    const process = spawn("python3", [SCRIPT_PATH, ...args], {
-      timeout: TIMEOUT_MS,
-    });
-
-    let stdout = "";
-    let stderr = "";
-
-    process.stdout.on("data", (data) => {
-      stdout += data.toString();
-    });
-
-    process.stderr.on("data", (data) => {
-      stderr += data.toString();
-    });
-
-    process.on("close", (code) => {
-      if (code !== 0) {
-        console.error(`[HomeHarvest] Process exited with code ${code}`);
-        console.error(`[HomeHarvest] stderr: ${stderr}`);
-        reject(new Error(`Process exited with code ${code}: ${stderr}`));
-        return;
-      }
-      resolve(stdout);
-    });
+const workers = new PythonWorkerPool(SCRIPT_PATH, "HomeHarvest", 2, TIMEOUT_MS);
 
-    process.on("error", (err) => {
-      console.error(`[HomeHarvest] Process error:`, err);
-      reject(err);
-    });
-  });
+function runPythonScript<T>(args: string[]): Promise<T> {
+  console.log(`[HomeHarvest] Running: ${args.join(" ")}`);
+  return workers.run<T>(args);
 }
 
 export async function lookupProperty(address: string): Promise<HomeHarvestLookupResult> {
   console.log(`[HomeHarvest] Looking up property: ${address}`);
   
   try {
-    const output = await runPythonScript(["lookup", address]);
-    const result = JSON.parse(output) as HomeHarvestLookupResult;
+    const result = await runPythonScript<HomeHarvestLookupResult>(["lookup", address]);
     
     if (result.success && result.data) {
       console.log(`[HomeHarvest] Found property: ${result.data.address.fullAddress}`);
@@ -162,8 +132,7 @@ export async function searchProperties(
   console.log(`[HomeHarvest] Searching properties in: ${location}, type: ${listingType}, limit: ${limit}`);
   
   try {
-    const output = await runPythonScript(["search", location, listingType, String(limit)]);
-    const result = JSON.parse(output) as HomeHarvestSearchResult;
+    const result = await runPythonScript<HomeHarvestSearchResult>(["search", location, listingType, String(limit)]);
     
     console.log(`[HomeHarvest] Found ${result.count || 0} properties`);
     
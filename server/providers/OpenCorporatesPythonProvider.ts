@@ -1,7 +1,7 @@
-import { spawn } from "child_process";
 import path from "path";
 import { fileURLToPath } from "url";
 import { trackProviderCall } from "../providerConfig";
+import { PythonWorkerPool } from "./pythonWorker";
 
 const __filename = fileURLToPath(import.meta.url);
 const __dirname = path.dirname(__filename);
@@ -93,45 +93,14 @@ export interface OfficersFetchResponse {
 
 const SCRIPT_PATH = path.join(__dirname, "../python/opencorporates_lookup.py");
 const TIMEOUT_MS = 30000;
+// One search (2 GETs) plus up to 10 company fetches (8 in parallel): 12 of the worker's 30/min
+const DETAILED_SEARCH_TIMEOUT_MS = 60000;
 
-function runPythonScript(args: string[]): Promise<string> {
-  return new Promise((resolve, reject) => {
-    console.log(`[OpenCorporatesPython] Running: python3 ${args[0]} ...`);
-    
-    const proc = spawn("python3", [SCRIPT_PATH, ...args], {
-      timeout: TIMEOUT_MS,
-      env: {
-        ...process.env,
-        OPENCORPORATES_API_KEY: process.env.OPENCORPORATES_API_KEY || "",
-      },
-    });
-
-    let stdout = "";
-    let stderr = "";
-
-    proc.stdout.on("data", (data) => {
-      stdout += data.toString();
-    });
+const workers = new PythonWorkerPool(SCRIPT_PATH, "OpenCorporatesPython", 2, TIMEOUT_MS);
 
-    proc.stderr.on("data", (data) => {
-      stderr += data.toString();
-    });
-
-    proc.on("close", (code) => {
-      if (code !== 0) {
-        console.error(`[OpenCorporatesPython] Process exited with code ${code}`);
-        console.error(`[OpenCorporatesPython] stderr: ${stderr}`);
-        reject(new Error(`Process exited with code ${code}: ${stderr}`));
-        return;
-      }
-      resolve(stdout);
-    });
-
-    proc.on("error", (err) => {
-      console.error(`[OpenCorporatesPython] Process error:`, err);
-      reject(err);
-    });
-  });
+function runPythonScript<T>(args: string[], timeoutMs?: number): Promise<T> {
+  console.log(`[OpenCorporatesPython] Running: ${args[0]} ...`);
+  return workers.run<T>(args, timeoutMs);
 }
 
 export async function searchCompanies(
@@ -146,8 +115,7 @@ export async function searchCompanies(
       args.push(jurisdiction);
     }
     
-    const output = await runPythonScript(args);
-    const result = JSON.parse(output) as CompanySearchResponse;
+    const result = await runPythonScript<CompanySearchResponse>(args);
     
     if (result.success) {
       trackProviderCall("opencorporates", false);
@@ -170,6 +138,45 @@ export async function searchCompanies(
   }
 }
 
+/**
+ * Search companies and fetch full details (officers, filings) for the top 10 hits.
+ * The per-company fetches run in parallel inside the Python worker.
+ */
+export async function searchCompaniesDetailed(
+  query: string,
+  jurisdiction?: string
+): Promise<CompanySearchResponse> {
+  console.log(`[OpenCorporatesPython] Searching companies with details: "${query}"${jurisdiction ? ` in ${jurisdiction}` : ""}`);
+  
+  try {
+    const args = ["search_companies_detailed", query];
+    if (jurisdiction) {
+      args.push(jurisdiction);
+    }
+    
+    const result = await runPythonScript<CompanySearchResponse>(args, DETAILED_SEARCH_TIMEOUT_MS);
+    
+    if (result.success) {
+      trackProviderCall("opencorporates", false);
+      console.log(`[OpenCorporatesPython] Fetched details for ${result.companies.length} companies (total: ${result.totalCount})`);
+    } else {
+      console.error(`[OpenCorporatesPython] Detailed search failed: ${result.error}`);
+    }
+    
+    return result;
+  } catch (error) {
+    const errorMessage = error instanceof Error ? error.message : String(error);
+    console.error(`[OpenCorporatesPython] Detailed search error:`, errorMessage);
+    return {
+      success: false,
+      error: errorMessage,
+      companies: [],
+      totalCount: 0,
+      query,
+    };
+  }
+}
+
 export async function searchOfficers(
   name: string,
   jurisdiction?: string
@@ -182,8 +189,7 @@ export async function searchOfficers(
       args.push(jurisdiction);
     }
     
-    const output = await runPythonScript(args);
-    const result = JSON.parse(output) as OfficerSearchResponse;
+    const result = await runPythonScript<OfficerSearchResponse>(args);
     
     if (result.success) {
       trackProviderCall("opencorporates", false);
@@ -213,8 +219,7 @@ export async function getCompany(
   console.log(`[OpenCorporatesPython] Fetching company: ${jurisdictionCode}/${companyNumber}`);
   
   try {
-    const output = await runPythonScript(["get_company", jurisdictionCode, companyNumber]);
-    const result = JSON.parse(output) as CompanyFetchResponse;
+    const result = await runPythonScript<CompanyFetchResponse>(["get_company", jurisdictionCode, companyNumber]);
     
     if (result.success && result.company) {
       trackProviderCall("opencorporates", false);
@@ -242,8 +247,7 @@ export async function getOfficers(
   console.log(`[OpenCorporatesPython] Fetching officers for: ${jurisdictionCode}/${companyNumber}`);
   
   try {
-    const output = await runPythonScript(["get_officers", jurisdictionCode, companyNumber]);
-    const result = JSON.parse(output) as OfficersFetchResponse;
+    const result = await runPythonScript<OfficersFetchResponse>(["get_officers", jurisdictionCode, companyNumber]);
     
     if (result.success) {
       trackProviderCall("opencorporates", false);
@@ -1,7 +1,7 @@
-import { spawn } from "child_process";
 import path from "path";
 import { fileURLToPath } from "url";
 import { trackProviderCall } from "../providerConfig";
+import { PythonWorkerPool } from "./pythonWorker";
 
 const __filename = fileURLToPath(import.meta.url);
 const __dirname = path.dirname(__filename);
@@ -42,40 +42,11 @@ export interface USPSCheckResult {
 const SCRIPT_PATH = path.join(__dirname, "../python/usps_lookup.py");
 const TIMEOUT_MS = 15000;
 
-function runPythonScript(args: string[]): Promise<string> {
-  return new Promise((resolve, reject) => {
-    console.log(`[USPS] Running: python3 usps_lookup.py ${args[0]} ...`);
-    
-    const process = spawn("python3", [SCRIPT_PATH, ...args], {
-      timeout: TIMEOUT_MS,
-    });
-
-    let stdout = "";
-    let stderr = "";
-
-    process.stdout.on("data", (data) => {
-      stdout += data.toString();
-    });
-
-    process.stderr.on("data", (data) => {
-      stderr += data.toString();
-    });
-
-    process.on("close", (code) => {
-      if (code !== 0) {
-        console.error(`[USPS] Process exited with code ${code}`);
-        console.error(`[USPS] stderr: ${stderr}`);
-        reject(new Error(`Process exited with code ${code}: ${stderr}`));
-        return;
-      }
-      resolve(stdout);
-    });
+const workers = new PythonWorkerPool(SCRIPT_PATH, "USPS", 2, TIMEOUT_MS);
 
-    process.on("error", (err) => {
-      console.error(`[USPS] Process error:`, err);
-      reject(err);
-    });
-  });
+function runPythonScript<T>(args: string[]): Promise<T> {
+  console.log(`[USPS] Running: ${args[0]} ...`);
+  return workers.run<T>(args);
 }
 
 export async function validateAddress(
@@ -92,8 +63,7 @@ export async function validateAddress(
       args.push(zipcode);
     }
     
-    const output = await runPythonScript(args);
-    const result = JSON.parse(output) as USPSValidationResult;
+    const result = await runPythonScript<USPSValidationResult>(args);
     
     if (result.success && result.validated) {
       trackProviderCall("usps", false);
@@ -118,8 +88,7 @@ export async function validateFullAddress(fullAddress: string): Promise<USPSVali
   console.log(`[USPS] Validating full address: ${fullAddress}`);
   
   try {
-    const output = await runPythonScript(["validate_full", fullAddress]);
-    const result = JSON.parse(output) as USPSValidationResult;
+    const result = await runPythonScript<USPSValidationResult>(["validate_full", fullAddress]);
     
     if (result.success && result.validated) {
       trackProviderCall("usps", false);
@@ -142,8 +111,7 @@ export async function validateFullAddress(fullAddress: string): Promise<USPSVali
 
 export async function checkConfiguration(): Promise<USPSCheckResult> {
   try {
-    const output = await runPythonScript(["check"]);
-    return JSON.parse(output) as USPSCheckResult;
+    return await runPythonScript<USPSCheckResult>(["check"]);
   } catch (error) {
     return {
       success: false,
@@ -0,0 +1,187 @@
+import { spawn, type ChildProcessWithoutNullStreams } from "child_process";
+
+/**
+ * Long-lived Python worker pool.
+ *
+ * Each worker runs `python3 <script> --daemon` and answers newline-delimited
+ * JSON requests of the form {"id": n, "args": [...]} with {"id": n, "result": {...}}.
+ * `args` is the same argument list the script accepts on the command line, so
+ * heavy imports (usaddress, pandas, dnspython) are paid once per worker instead
+ * of once per call.
+ *
+ * The scripts answer one request at a time, so the pool keeps the queue and hands
+ * each worker a single request at a time. A request's timeout starts when it is
+ * sent, not while it waits in the queue.
+ */
+
+interface QueuedRequest {
+  args: string[];
+  timeoutMs: number;
+  resolve: (result: unknown) => void;
+  reject: (error: Error) => void;
+}
+
+interface ActiveRequest {
+  id: number;
+  request: QueuedRequest;
+  timer: NodeJS.Timeout;
+}
+
+class PythonWorker {
+  private proc: ChildProcessWithoutNullStreams | null = null;
+  private active: ActiveRequest | null = null;
+  private nextId = 1;
+  private buffer = "";
+
+  constructor(
+    private scriptPath: string,
+    private label: string,
+    private onIdle: () => void
+  ) {}
+
+  get busy(): boolean {
+    return this.active !== null;
+  }
+
+  send(request: QueuedRequest): void {
+    const proc = this.ensureProcess();
+    const id = this.nextId++;
+
+    const timer = setTimeout(() => {
+      // A hung request would block every later one on this worker, so recycle it.
+      // Only this request fails; queued ones go to the restarted process.
+      this.finish(id)?.reject(new Error(`Request timed out after ${request.timeoutMs}ms`));
+      this.kill();
+      this.onIdle();
+    }, request.timeoutMs);
+
+    this.active = { id, request, timer };
+    proc.stdin.write(JSON.stringify({ id, args: request.args }) + "\n");
+  }
+
+  private ensureProcess(): ChildProcessWithoutNullStreams {
+    if (this.proc) {
+      return this.proc;
+    }
+
+    const proc = spawn("python3", [this.scriptPath, "--daemon"]);
+    this.proc = proc;
+    this.buffer = "";
+
+    // Decode as a stream so multi-byte UTF-8 characters split across chunks stay intact
+    proc.stdout.setEncoding("utf8");
+    proc.stdout.on("data", (data: string) => {
+      this.buffer += data;
+      let newline: number;
+      while ((newline = this.buffer.indexOf("\n")) !== -1) {
+        const line = this.buffer.slice(0, newline).trim();
+        this.buffer = this.buffer.slice(newline + 1);
+        if (line) {
+          this.handleLine(line);
+        }
+      }
+    });
+
+    proc.stdin.on("error", (err) => {
+      // EPIPE when the worker dies mid-write; the exit handler rejects the active request
+      console.error(`[${this.label}] Worker stdin error:`, err.message);
+    });
+
+    proc.stderr.on("data", (data) => {
+      console.error(`[${this.label}] stderr: ${data.toString().trim()}`);
+    });
+
+    // Only the current process owns the active request; a recycled one was already failed
+    proc.on("exit", (code) => {
+      if (this.proc === proc) {
+        this.proc = null;
+        this.failActive(new Error(`Worker exited with code ${code}`));
+      }
+    });
+
+    proc.on("error", (err) => {
+      console.error(`[${this.label}] Worker error:`, err);
+      if (this.proc === proc) {
+        this.proc = null;
+        this.failActive(err);
+      }
+    });
+
+    return proc;
+  }
+
+  private handleLine(line: string): void {
+    let message: { id?: number; result?: unknown };
+    try {
+      message = JSON.parse(line);
+    } catch {
+      // Libraries occasionally print to stdout; ignore anything that isn't a response
+      return;
+    }
+
+    if (typeof message.id !== "number") {
+      return;
+    }
+
+    const request = this.finish(message.id);
+    if (request) {
+      request.resolve(message.result);
+      this.onIdle();
+    }
+  }
+
+  /** Clear the active request if it has this id and return it. */
+  private finish(id: number): QueuedRequest | null {
+    if (!this.active || this.active.id !== id) {
+      return null;
+    }
+    const { request, timer } = this.active;
+    clearTimeout(timer);
+    this.active = null;
+    return request;
+  }
+
+  private failActive(error: Error): void {
+    if (this.active) {
+      this.finish(this.active.id)?.reject(error);
+      this.onIdle();
+    }
+  }
+
+  private kill(): void {
+    const proc = this.proc;
+    this.proc = null;
+    proc?.kill();
+  }
+}
+
+export class PythonWorkerPool {
+  private workers: PythonWorker[];
+  private queue: QueuedRequest[] = [];
+
+  constructor(scriptPath: string, label: string, size: number, private timeoutMs: number) {
+    this.workers = Array.from({ length: size }, () => new PythonWorker(scriptPath, label, () => this.dispatch()));
+  }
+
+  /**
+   * Run one command on the next free worker and resolve with its JSON result.
+   * `timeoutMs` overrides the pool default, e.g. for batch commands.
+   */
+  run<T>(args: string[], timeoutMs: number = this.timeoutMs): Promise<T> {
+    return new Promise<unknown>((resolve, reject) => {
+      this.queue.push({ args, timeoutMs, resolve, reject });
+      this.dispatch();
+    }) as Promise<T>;
+  }
+
+  private dispatch(): void {
+    for (const worker of this.workers) {
+      if (this.queue.length === 0) {
+        return;
+      }
+      if (!worker.busy) {
+        worker.send(this.queue.shift()!);
+      }
+    }
+  }
+}
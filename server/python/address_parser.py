@@ -4,11 +4,13 @@ Address parsing and normalization using usaddress library.
 Provides structured address parsing for US addresses.
 """
 
+import functools
 import json
-import sys
 import re
 import usaddress
 
+from worker_io import UsageError, run_main
+
 STREET_TYPE_EXPANSIONS = {
     'st': 'street',
     'ave': 'avenue',
@@ -42,6 +44,12 @@ DIRECTION_EXPANSIONS = {
 
 DIRECTION_ABBREVIATIONS = {v: k.upper() for k, v in DIRECTION_EXPANSIONS.items()}
 
+# Lowercase full or abbreviated form -> uppercase abbreviation, so normalizing is one lookup
+_STREET_TYPE_CANONICAL = {**STREET_TYPE_ABBREVIATIONS, **{k: k.upper() for k in STREET_TYPE_EXPANSIONS}}
+_DIRECTION_CANONICAL = {**DIRECTION_ABBREVIATIONS, **{k: k.upper() for k in DIRECTION_EXPANSIONS}}
+_STREET_TYPE_CANONICAL_SET = frozenset(_STREET_TYPE_CANONICAL.values())
+_DIRECTION_CANONICAL_SET = frozenset(_DIRECTION_CANONICAL.values())
+
 UNIT_TYPE_EXPANSIONS = {
     'apt': 'apartment',
     'ste': 'suite',
@@ -61,31 +69,89 @@ SPACED_ABBREVIATIONS = {
     'n a': 'NA',
 }
 
+# Owner and address lists repeat heavily; daemon workers keep these caches warm.
+# Cached results are shared, so callers must treat them as read-only.
+PARSE_CACHE_SIZE = 10_000
+
+# Compiled once at import; these run on every parse/normalize call.
+# All spaced abbreviations share one alternation so the text is scanned once. Each
+# alternative is its own group and the replacement is found by group number: with
+# IGNORECASE the matched text can differ from the key (e.g. dotless 'ı' matches 'i').
+_SPACED_ALT = re.compile(
+    r'\b(?:' + '|'.join(f'({re.escape(s)})' for s in SPACED_ABBREVIATIONS) + r')\b',
+    re.IGNORECASE,
+)
+_SPACED_REPLACEMENTS = list(SPACED_ABBREVIATIONS.values())
+_WS_RE = re.compile(r'\s+')
+_DOUBLE_COMMA_RE = re.compile(r',\s*,')
+
+# Entity suffixes kept uppercase by normalize_entity_name (whole words only)
+ENTITY_ABBREVIATIONS = {'LLC', 'INC', 'LP', 'LTD', 'PC', 'PA', 'NA', 'CO', 'CORP'}
+_ENTITY_ABBREVIATION_RE = re.compile(
+    r'(?<!\S)(?:' + '|'.join(ENTITY_ABBREVIATIONS) + r')(?!\S)',
+    re.IGNORECASE,
+)
+
 def fix_spaced_letters(text):
     """Fix spaced letters like 'L L C' -> 'LLC'"""
-    result = text.lower()
-    for spaced, fixed in SPACED_ABBREVIATIONS.items():
-        result = re.sub(r'\b' + spaced + r'\b', fixed, result, flags=re.IGNORECASE)
-    return result
+    return _SPACED_ALT.sub(lambda m: _SPACED_REPLACEMENTS[m.lastindex - 1], text.lower())
 
 def normalize_street_type(street_type):
     """Normalize street type to uppercase abbreviation"""
-    lower = street_type.lower().strip('.')
-    if lower in STREET_TYPE_ABBREVIATIONS:
-        return STREET_TYPE_ABBREVIATIONS[lower]
-    if lower in STREET_TYPE_EXPANSIONS:
-        return lower.upper()
-    return street_type.upper()
+    if street_type in _STREET_TYPE_CANONICAL_SET:
+        return street_type
+    return _STREET_TYPE_CANONICAL.get(street_type.lower().strip('.'), street_type.upper())
 
 def normalize_direction(direction):
     """Normalize direction to uppercase abbreviation"""
-    lower = direction.lower().strip('.')
-    if lower in DIRECTION_ABBREVIATIONS:
-        return DIRECTION_ABBREVIATIONS[lower]
-    if lower in DIRECTION_EXPANSIONS:
-        return lower.upper()
-    return direction.upper()
+    if direction in _DIRECTION_CANONICAL_SET:
+        return direction
+    return _DIRECTION_CANONICAL.get(direction.lower().strip('.'), direction.upper())
+
+# Strict "NUMBER [DIR] STREET TYPE [DIR], CITY, ST ZIP" template. Matches are tagged
+# directly and skip the usaddress CRF tagger; anything else falls through to it.
+# Input is already lowercased by fix_spaced_letters.
+_DIRECTION_WORDS = '|'.join(sorted(_DIRECTION_CANONICAL, key=len, reverse=True))
+_STREET_TYPE_WORDS = '|'.join(sorted(_STREET_TYPE_CANONICAL, key=len, reverse=True))
+_SIMPLE_ADDRESS_RE = re.compile(
+    r'^(?P<AddressNumber>\d+[a-z]?)'
+    r'(?:\s+(?P<StreetNamePreDirectional>(?:' + _DIRECTION_WORDS + r')\.?))?'
+    r'\s+(?P<StreetName>[a-z0-9]+(?:\s[a-z0-9]+)*?)'
+    r'\s+(?P<StreetNamePostType>(?:' + _STREET_TYPE_WORDS + r')\.?)'
+    r'(?:\s+(?P<StreetNamePostDirectional>(?:' + _DIRECTION_WORDS + r')\.?))?'
+    r',\s*(?P<PlaceName>[a-z]+(?:\s[a-z]+)*)'
+    r',?\s+(?P<StateName>[a-z]{2})'
+    r'\s+(?P<ZipCode>\d{5}(?:-\d{4})?)$'
+)
 
+# Street or city words that usaddress may read as a type/direction; leave those to the CRF
+_AMBIGUOUS_WORDS = frozenset(_DIRECTION_CANONICAL) | frozenset(_STREET_TYPE_CANONICAL) | frozenset(UNIT_TYPE_EXPANSIONS)
+
+def _tag_simple_address(address):
+    """Tag an address matching the strict template without usaddress, or return None."""
+    match = _SIMPLE_ADDRESS_RE.match(address)
+    if match is None:
+        return None
+    words = match.group('StreetName').split() + match.group('PlaceName').split()
+    if not _AMBIGUOUS_WORDS.isdisjoint(words):
+        return None
+    return {label: value for label, value in match.groupdict().items() if value is not None}
+
+# (response key, usaddress label, normalizer or None to pass through)
+_COMPONENT_FIELDS = [
+    ('addressNumber', 'AddressNumber', None),
+    ('streetNamePreDirectional', 'StreetNamePreDirectional', normalize_direction),
+    ('streetName', 'StreetName', str.upper),
+    ('streetNamePostType', 'StreetNamePostType', normalize_street_type),
+    ('streetNamePostDirectional', 'StreetNamePostDirectional', normalize_direction),
+    ('occupancyType', 'OccupancyType', str.upper),
+    ('occupancyIdentifier', 'OccupancyIdentifier', str.upper),
+    ('placeName', 'PlaceName', str.upper),
+    ('stateName', 'StateName', str.upper),
+    ('zipCode', 'ZipCode', None),
+]
+
+@functools.lru_cache(maxsize=PARSE_CACHE_SIZE)
 def parse_address(address_string):
     """
     Parse an address string into structured components.
@@ -100,25 +166,21 @@ def parse_address(address_string):
         }
     
     cleaned = fix_spaced_letters(address_string.strip())
-    cleaned = re.sub(r'\s+', ' ', cleaned)
-    cleaned = re.sub(r',\s*,', ',', cleaned)
+    cleaned = _WS_RE.sub(' ', cleaned)
+    cleaned = _DOUBLE_COMMA_RE.sub(',', cleaned)
     
     try:
-        tagged_address, address_type = usaddress.tag(cleaned)
+        tagged_address = _tag_simple_address(cleaned)
+        if tagged_address is not None:
+            address_type = 'Street Address'
+        else:
+            tagged_address, address_type = usaddress.tag(cleaned)
         
-        components = {
-            'addressNumber': tagged_address.get('AddressNumber', ''),
-            'streetNamePreDirectional': normalize_direction(tagged_address.get('StreetNamePreDirectional', '')) if tagged_address.get('StreetNamePreDirectional') else '',
-            'streetName': tagged_address.get('StreetName', '').upper() if tagged_address.get('StreetName') else '',
-            'streetNamePostType': normalize_street_type(tagged_address.get('StreetNamePostType', '')) if tagged_address.get('StreetNamePostType') else '',
-            'streetNamePostDirectional': normalize_direction(tagged_address.get('StreetNamePostDirectional', '')) if tagged_address.get('StreetNamePostDirectional') else '',
-            'occupancyType': tagged_address.get('OccupancyType', '').upper() if tagged_address.get('OccupancyType') else '',
-            'occupancyIdentifier': tagged_address.get('OccupancyIdentifier', '').upper() if tagged_address.get('OccupancyIdentifier') else '',
-            'placeName': tagged_address.get('PlaceName', '').upper() if tagged_address.get('PlaceName') else '',
-            'stateName': tagged_address.get('StateName', '').upper() if tagged_address.get('StateName') else '',
-            'zipCode': tagged_address.get('ZipCode', ''),
-            'addressType': address_type,
-        }
+        components = {}
+        for out_key, tag, normalize in _COMPONENT_FIELDS:
+            value = tagged_address.get(tag, '')
+            components[out_key] = normalize(value) if value and normalize else value
+        components['addressType'] = address_type
         
         street_parts = []
         if components['addressNumber']:
@@ -174,6 +236,14 @@ def parse_address(address_string):
             'normalized': None,
         }
 
+def parse_address_many(addresses):
+    """
+    Parse a list of address strings in one call, returning one result per input.
+    Lets a single process (and its usaddress import) serve a whole batch.
+    """
+    return [parse_address(address) for address in addresses]
+
+@functools.lru_cache(maxsize=PARSE_CACHE_SIZE)
 def normalize_entity_name(name):
     """
     Normalize entity/owner names (fix spaced letters, consistent casing).
@@ -182,49 +252,38 @@ def normalize_entity_name(name):
         return ''
     
     normalized = fix_spaced_letters(name)
-    normalized = re.sub(r'\s+', ' ', normalized).strip()
-    
-    words = normalized.split()
-    result_words = []
-    
-    abbreviations = {'LLC', 'INC', 'LP', 'LTD', 'PC', 'PA', 'NA', 'CO', 'CORP'}
-    
-    for word in words:
-        upper = word.upper()
-        if upper in abbreviations:
-            result_words.append(upper)
-        else:
-            result_words.append(word.title())
+    normalized = _WS_RE.sub(' ', normalized).strip()
     
-    return ' '.join(result_words)
+    return _ENTITY_ABBREVIATION_RE.sub(lambda m: m.group(0).upper(), normalized.title())
 
-def main():
-    if len(sys.argv) < 3:
-        print(json.dumps({
-            'success': False,
-            'error': 'Usage: python address_parser.py <command> <input>',
-        }))
-        sys.exit(1)
+def run_command(args):
+    """Run one command given CLI-style arguments and return the result dict."""
+    if len(args) < 2:
+        raise UsageError('Usage: python address_parser.py <command> <input>')
     
-    command = sys.argv[1]
-    input_text = sys.argv[2]
+    command = args[0]
+    input_text = args[1]
     
     if command == 'parse':
-        result = parse_address(input_text)
-        print(json.dumps(result))
+        return parse_address(input_text)
     elif command == 'normalize_name':
-        result = {
+        return {
             'success': True,
             'normalized': normalize_entity_name(input_text),
             'raw': input_text,
         }
-        print(json.dumps(result))
-    else:
-        print(json.dumps({
-            'success': False,
-            'error': f'Unknown command: {command}',
-        }))
-        sys.exit(1)
+    elif command == 'parse_many':
+        try:
+            addresses = json.loads(input_text)
+        except ValueError:
+            addresses = None
+        if not isinstance(addresses, list) or not all(isinstance(a, str) for a in addresses):
+            raise UsageError('parse_many expects a JSON array of address strings')
+        return parse_address_many(addresses)
+    raise UsageError(f'Unknown command: {command}')
+
+def main():
+    run_main(run_command)
 
 if __name__ == '__main__':
     main()
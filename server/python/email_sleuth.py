@@ -10,29 +10,59 @@ Features:
 - Email scoring and ranking
 """
 
-import sys
+import os
 import json
+import time
+import heapq
 import socket
+import asyncio
 import smtplib
 import dns.resolver
-from typing import List, Dict, Optional, Tuple
-from dataclasses import dataclass, asdict
+import dns.asyncresolver
 import re
+from typing import List, Dict, Optional, Tuple
+from dataclasses import dataclass
+
+from worker_io import UsageError, run_main
 
 
-@dataclass
+@dataclass(slots=True)
 class EmailCandidate:
     email: str
     pattern: str
     confidence: int
     verified: Optional[bool] = None
     verification_message: str = ""
+    
+    def to_dict(self) -> Dict:
+        return {
+            "email": self.email,
+            "pattern": self.pattern,
+            "confidence": self.confidence,
+            "verified": self.verified,
+            "verification_message": self.verification_message,
+        }
+
+
+class _NameCharFilter(dict):
+    """
+    str.translate table that keeps a-z, whitespace and '-' and deletes
+    everything else. Entries are filled in on first sight of each code point.
+    """
+    def __missing__(self, code: int) -> Optional[int]:
+        char = chr(code)
+        keep = 'a' <= char <= 'z' or char == '-' or char.isspace()
+        self[code] = code if keep else None
+        return self[code]
+
+
+_NAME_CHAR_FILTER = _NameCharFilter()
 
 
 def normalize_name(name: str) -> Tuple[str, str]:
     """Extract and normalize first and last name from a full name."""
     name = name.strip().lower()
-    name = re.sub(r'[^a-z\s\-]', '', name)
+    name = name.translate(_NAME_CHAR_FILTER)
     parts = name.split()
     
     if len(parts) >= 2:
@@ -51,6 +81,28 @@ def normalize_name(name: str) -> Tuple[str, str]:
     return first, last
 
 
+# (pattern name, confidence, template) in preference order. Templates see
+# first/last names, their initials f/l, and the domain.
+EMAIL_PATTERNS = [
+    ("firstname.lastname", 95, "{first}.{last}@{domain}"),
+    ("firstnamelastname", 90, "{first}{last}@{domain}"),
+    ("f.lastname", 85, "{f}{last}@{domain}"),
+    ("firstname_lastname", 80, "{first}_{last}@{domain}"),
+    ("firstname-lastname", 75, "{first}-{last}@{domain}"),
+    ("lastname.firstname", 70, "{last}.{first}@{domain}"),
+    ("f.lastname", 65, "{f}.{last}@{domain}"),
+    ("firstname", 60, "{first}@{domain}"),
+    ("firstnamel", 55, "{first}{l}@{domain}"),
+    ("fl", 50, "{f}{l}@{domain}"),
+]
+
+# Templates that need a last name are skipped when only a first name is known
+_EMAIL_PATTERN_SPECS = [
+    (pattern, confidence, template, "{last}" in template or "{l}" in template)
+    for pattern, confidence, template in EMAIL_PATTERNS
+]
+
+
 def generate_email_patterns(first: str, last: str, domain: str) -> List[EmailCandidate]:
     """Generate common email patterns with confidence scores."""
     patterns = []
@@ -58,54 +110,168 @@ def generate_email_patterns(first: str, last: str, domain: str) -> List[EmailCan
     if not first or not domain:
         return patterns
     
-    f = first[0] if first else ""
+    # Callers pass normalize_name() output and a cleaned domain; lowercase once here
+    # rather than per generated address
+    first, last, domain = first.lower(), last.lower(), domain.lower()
+    f = first[0]
     l = last[0] if last else ""
     
-    pattern_templates = [
-        (f"{first}.{last}@{domain}", "firstname.lastname", 95),
-        (f"{first}{last}@{domain}", "firstnamelastname", 90),
-        (f"{f}{last}@{domain}", "f.lastname", 85),
-        (f"{first}_{last}@{domain}", "firstname_lastname", 80),
-        (f"{first}-{last}@{domain}", "firstname-lastname", 75),
-        (f"{last}.{first}@{domain}", "lastname.firstname", 70),
-        (f"{f}.{last}@{domain}", "f.lastname", 65),
-        (f"{first}@{domain}", "firstname", 60),
-        (f"{first}{l}@{domain}", "firstnamel", 55),
-        (f"{f}{l}@{domain}", "fl", 50),
-    ]
-    
-    if last:
-        for email, pattern, confidence in pattern_templates:
-            if email and '@' in email and not email.startswith('@'):
-                patterns.append(EmailCandidate(
-                    email=email.lower(),
-                    pattern=pattern,
-                    confidence=confidence
-                ))
-    else:
-        patterns.append(EmailCandidate(
-            email=f"{first}@{domain}".lower(),
-            pattern="firstname",
-            confidence=60
-        ))
-    
     seen = set()
-    unique_patterns = []
-    for p in patterns:
-        if p.email not in seen:
-            seen.add(p.email)
-            unique_patterns.append(p)
+    for pattern, confidence, template, needs_last in _EMAIL_PATTERN_SPECS:
+        if needs_last and not last:
+            continue
+        email = template.format(first=first, last=last, f=f, l=l, domain=domain)
+        if email not in seen:
+            seen.add(email)
+            patterns.append(EmailCandidate(
+                email=email,
+                pattern=pattern,
+                confidence=confidence
+            ))
     
-    return unique_patterns
+    return patterns
+
+
+# MX answers are cached per (domain, limit) until their DNS TTL expires (capped),
+# so several people at one company share a lookup. Failures are cached briefly.
+MX_CACHE_SIZE = 1024
+MX_CACHE_MAX_TTL = 3600
+MX_NEGATIVE_TTL = 60
+_mx_cache: Dict[Tuple[str, int], Tuple[float, List[str]]] = {}
+
+
+def _cached_mx_records(domain: str, limit: int) -> Optional[List[str]]:
+    entry = _mx_cache.get((domain, limit))
+    if entry and entry[0] > time.time():
+        return entry[1]
+    return None
 
 
-def get_mx_records(domain: str) -> List[str]:
-    """Get MX records for a domain."""
+def _store_mx_records(domain: str, limit: int, answers) -> List[str]:
+    """Cache and return the top exchanges from a resolver answer (None on failure)."""
+    now = time.time()
+    if answers is None:
+        records, expires = [], now + MX_NEGATIVE_TTL
+    else:
+        records = [str(r.exchange).rstrip('.') for r in heapq.nsmallest(limit, answers, key=lambda x: x.preference)]
+        expires = min(answers.expiration, now + MX_CACHE_MAX_TTL)
+    
+    if len(_mx_cache) >= MX_CACHE_SIZE:
+        _mx_cache.pop(next(iter(_mx_cache)))
+    _mx_cache[(domain, limit)] = (expires, records)
+    return records
+
+
+def get_mx_records(domain: str, limit: int = 3) -> List[str]:
+    """Get the `limit` most preferred MX records for a domain, best first."""
+    cached = _cached_mx_records(domain, limit)
+    if cached is not None:
+        return cached
+    try:
+        answers = dns.resolver.resolve(domain, 'MX')
+    except Exception:
+        answers = None
+    return _store_mx_records(domain, limit, answers)
+
+
+async def get_mx_records_async(domain: str, limit: int = 3) -> List[str]:
+    """Async get_mx_records; shares its cache so lookups can be prefetched with gather()."""
+    cached = _cached_mx_records(domain, limit)
+    if cached is not None:
+        return cached
     try:
-        mx_records = dns.resolver.resolve(domain, 'MX')
-        return [str(r.exchange).rstrip('.') for r in sorted(mx_records, key=lambda x: x.preference)]
+        answers = await dns.asyncresolver.resolve(domain, 'MX')
     except Exception:
-        return []
+        answers = None
+    return _store_mx_records(domain, limit, answers)
+
+
+def _rcpt_result(code: int, message: bytes) -> Tuple[Optional[bool], str]:
+    """Interpret an SMTP RCPT TO reply."""
+    if code == 250:
+        return True, f"SMTP verified: {message.decode()}"
+    elif code == 550:
+        return False, f"Email does not exist: {message.decode()}"
+    else:
+        return None, f"Inconclusive: {code} {message.decode()}"
+
+
+def _smtp_error_message(error: Exception) -> str:
+    """Describe an SMTP/socket failure for verification_message."""
+    if isinstance(error, smtplib.SMTPConnectError):
+        return f"Connection failed: {str(error)}"
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return "Server disconnected"
+    if isinstance(error, socket.timeout):
+        return "Connection timeout (port 25 may be blocked)"
+    return f"Verification error: {str(error)}"
+
+
+def _is_connection_error(error: Exception) -> bool:
+    """True for failures to reach the MX host at all (SMTPException subclasses OSError)."""
+    if isinstance(error, smtplib.SMTPConnectError):
+        return True
+    return isinstance(error, OSError) and not isinstance(error, smtplib.SMTPException)
+
+
+def verify_emails_batch(
+    emails: List[str],
+    mx_host: str,
+    timeout: int = 10,
+    stop_on_verified: bool = False
+) -> List[Tuple[Optional[bool], str]]:
+    """
+    Verify several addresses over a single SMTP session to one MX host.
+    Each address costs RSET/MAIL FROM/RCPT TO instead of a full handshake;
+    a session dropped mid-batch is reopened once per address, and only a failure
+    to connect at all ends the batch early.
+    Returns one (verified, message) tuple per address checked. With
+    stop_on_verified the list ends at the first verified address.
+    """
+    results = []
+    smtp = None
+    
+    try:
+        for index, email in enumerate(emails):
+            for attempt in range(2):
+                try:
+                    if smtp is None:
+                        smtp = smtplib.SMTP(timeout=timeout)
+                        smtp.connect(mx_host, 25)
+                        smtp.helo('mail.example.com')
+                    else:
+                        smtp.rset()
+                    smtp.mail('verify@example.com')
+                    code, message = smtp.rcpt(email)
+                    result = _rcpt_result(code, message)
+                    break
+                except smtplib.SMTPServerDisconnected as e:
+                    # Some servers close the session after a few RCPTs
+                    smtp.close()
+                    smtp = None
+                    result = (None, _smtp_error_message(e))
+                except Exception as e:
+                    if _is_connection_error(e):
+                        # Connect/timeout failures would repeat for every remaining address
+                        failure = (None, _smtp_error_message(e))
+                        results.extend([failure] * (len(emails) - index))
+                        return results
+                    # Anything else (a refused command, an undecodable reply) is about this address only
+                    result = (None, _smtp_error_message(e))
+                    break
+            
+            results.append(result)
+            if stop_on_verified and result[0] is True:
+                break
+        
+        return results
+    
+    finally:
+        if smtp is not None:
+            try:
+                smtp.quit()
+            except Exception:
+                pass
 
 
 def verify_email_smtp(email: str, mx_host: str, timeout: int = 10) -> Tuple[bool, str]:
@@ -113,41 +279,51 @@ def verify_email_smtp(email: str, mx_host: str, timeout: int = 10) -> Tuple[bool
     Verify email existence via SMTP.
     Returns (verified, message) tuple.
     """
-    try:
-        smtp = smtplib.SMTP(timeout=timeout)
-        smtp.connect(mx_host, 25)
-        smtp.helo('mail.example.com')
-        smtp.mail('verify@example.com')
-        code, message = smtp.rcpt(email)
-        smtp.quit()
-        
-        if code == 250:
-            return True, f"SMTP verified: {message.decode()}"
-        elif code == 550:
-            return False, f"Email does not exist: {message.decode()}"
-        else:
-            return None, f"Inconclusive: {code} {message.decode()}"
-    
-    except smtplib.SMTPConnectError as e:
-        return None, f"Connection failed: {str(e)}"
-    except smtplib.SMTPServerDisconnected:
-        return None, "Server disconnected"
-    except socket.timeout:
-        return None, "Connection timeout (port 25 may be blocked)"
-    except Exception as e:
-        return None, f"Verification error: {str(e)}"
+    return verify_emails_batch([email], mx_host, timeout)[0]
+
+
+# A successful port 25 probe holds for the life of the worker; a failed one is
+# retried after this long so a transient network blip doesn't disable SMTP for good.
+SMTP_PROBE_RETRY_SECONDS = 600
+_smtp_probe_ok = False
+_smtp_probe_failed_at: Optional[float] = None
 
 
 def check_smtp_available(timeout: int = 5) -> bool:
-    """Check if outbound SMTP port 25 is available."""
-    try:
-        socket.setdefaulttimeout(timeout)
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        result = sock.connect_ex(('gmail-smtp-in.l.google.com', 25))
-        sock.close()
-        return result == 0
-    except:
+    """
+    Check if outbound SMTP port 25 is available.
+    SMTP_PROBE_RESULT=true/false skips the probe.
+    """
+    global _smtp_probe_ok, _smtp_probe_failed_at
+    
+    override = os.environ.get('SMTP_PROBE_RESULT')
+    if override:
+        return override.strip().lower() in ('1', 'true', 'yes')
+    
+    if _smtp_probe_ok:
+        return True
+    if _smtp_probe_failed_at is not None and time.monotonic() - _smtp_probe_failed_at < SMTP_PROBE_RETRY_SECONDS:
         return False
+    
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            _smtp_probe_ok = sock.connect_ex(('gmail-smtp-in.l.google.com', 25)) == 0
+    except Exception:
+        _smtp_probe_ok = False
+    
+    if not _smtp_probe_ok:
+        _smtp_probe_failed_at = time.monotonic()
+    return _smtp_probe_ok
+
+
+_DOMAIN_RE = re.compile(r'^(?:https?://)?+(?:www\.)?([^/\s]+)', re.IGNORECASE)
+
+
+def clean_domain(domain: str) -> str:
+    """Reduce a URL or hostname to a bare lowercase domain."""
+    match = _DOMAIN_RE.match(domain.strip())
+    return match.group(1).lower() if match else ''
 
 
 def discover_email(
@@ -178,11 +354,7 @@ def discover_email(
             "domain": domain
         }
     
-    domain = domain.lower().strip()
-    if domain.startswith('http'):
-        domain = domain.split('//')[1].split('/')[0]
-    if domain.startswith('www.'):
-        domain = domain[4:]
+    domain = clean_domain(domain)
     
     candidates = generate_email_patterns(first, last, domain)
     
@@ -203,8 +375,12 @@ def discover_email(
     
     if verify_smtp and smtp_available and mx_records:
         mx_host = mx_records[0]
-        for i, candidate in enumerate(candidates[:max_verify]):
-            verified, message = verify_email_smtp(candidate.email, mx_host)
+        to_verify = candidates[:max_verify]
+        
+        # One SMTP session for every candidate; verification stops at the first match
+        results = verify_emails_batch([c.email for c in to_verify], mx_host, stop_on_verified=True)
+        
+        for candidate, (verified, message) in zip(to_verify, results):
             candidate.verified = verified
             candidate.verification_message = message
             
@@ -230,30 +406,61 @@ def discover_email(
         "lastName": last,
         "domain": domain,
         "hasMxRecords": has_mx,
-        "mxRecords": mx_records[:3],
+        "mxRecords": mx_records,
         "smtpAvailable": smtp_available,
-        "bestMatch": asdict(best_match) if best_match else None,
-        "verifiedEmails": [asdict(e) for e in verified_emails],
-        "allCandidates": [asdict(c) for c in candidates],
+        "bestMatch": best_match.to_dict() if best_match else None,
+        "verifiedEmails": [e.to_dict() for e in verified_emails],
+        "allCandidates": [c.to_dict() for c in candidates],
         "candidateCount": len(candidates)
     }
 
 
-def main():
-    """CLI entry point."""
-    if len(sys.argv) < 3:
-        print(json.dumps({
-            "success": False,
-            "error": "Usage: email_sleuth.py <name> <domain> [--no-verify]"
-        }))
-        sys.exit(1)
+def discover_emails_batch(
+    contacts: List[Tuple[str, str]],
+    verify_smtp: bool = True,
+    max_verify: int = 5
+) -> List[Dict]:
+    """
+    Discover emails for many (name, domain) pairs.
+    MX records for every distinct domain are resolved concurrently first, so
+    each discovery then reads them from the cache.
+    """
+    domains = {clean_domain(domain) for _, domain in contacts}
     
-    name = sys.argv[1]
-    domain = sys.argv[2]
-    verify = "--no-verify" not in sys.argv
+    async def prefetch():
+        await asyncio.gather(*(get_mx_records_async(domain) for domain in domains))
     
-    result = discover_email(name, domain, verify_smtp=verify)
-    print(json.dumps(result, indent=2))
+    asyncio.run(prefetch())
+    
+    return [discover_email(name, domain, verify_smtp, max_verify) for name, domain in contacts]
+
+
+def run_command(args: List[str]):
+    """Run one discovery (or --batch) given CLI-style arguments and return the result."""
+    if args[:1] == ["--batch"] and len(args) >= 2:
+        try:
+            contacts = json.loads(args[1])
+        except ValueError:
+            contacts = None
+        if not isinstance(contacts, list) or not all(
+            isinstance(c, list) and len(c) == 2 and all(isinstance(v, str) for v in c) for c in contacts
+        ):
+            raise UsageError("--batch expects a JSON array of [name, domain] pairs")
+        return discover_emails_batch([tuple(c) for c in contacts], verify_smtp="--no-verify" not in args)
+    
+    if len(args) < 2:
+        raise UsageError("Usage: email_sleuth.py <name> <domain> [--no-verify] | --batch '<json pairs>' [--no-verify]")
+    
+    name = args[0]
+    domain = args[1]
+    verify = "--no-verify" not in args
+    
+    return discover_email(name, domain, verify_smtp=verify)
+
+
+def main():
+    """CLI entry point."""
+    run_main(run_command)
 
 
 if __name__ == "__main__":
@@ -6,40 +6,264 @@ Returns JSON to stdout for parsing by the Node.js process
 """
 
 import sys
-import json
+import atexit
 import time
+import random
 import signal
 import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
-from homeharvest import scrape_property
+import numpy as np
+import pandas as pd
+
+from rate_limit import admit, RateLimitExceeded
+from worker_io import UsageError, run_main
 
 
 # Timeout for each scrape attempt (in seconds)
 SCRAPE_TIMEOUT_SECONDS = 20
 
+# Retry backoff: (2 ** retry) * base seconds, capped, then jittered
+RETRY_BASE_DELAY_SECONDS = 1.0
+RETRY_MAX_DELAY_SECONDS = 30
+# Total wall-clock allowed for all attempts; stays under the Node caller's 90s timeout
+RETRY_BUDGET_SECONDS = 75
+
+# Client-side cap per worker so bursts are spread out instead of answered with 429s
+REALTOR_REQUESTS_PER_MINUTE = 30
+
+def _is_missing(value) -> bool:
+    return value is None or value is pd.NA or value is pd.NaT or (isinstance(value, float) and value != value)
+
+
+def _int_value(prop, key):
+    """Fetch a field once; 0 and missing values become None."""
+    value = prop.get(key)
+    return None if _is_missing(value) or not value else int(value)
+
+
+def _float_value(prop, key):
+    """Fetch a field once; 0 and missing values become None."""
+    value = prop.get(key)
+    return None if _is_missing(value) or not value else float(value)
+
+
+def _str_value(prop, key):
+    """Fetch a field once; missing or empty values become ""."""
+    value = prop.get(key)
+    return "" if _is_missing(value) or not value else str(value)
+
+
+# Single-property lookup response: section -> [(response key, HomeHarvest column, coercer)]
+LOOKUP_SCHEMA = {
+    "address": [
+        ("street", "street_address", _str_value),
+        ("city", "city", _str_value),
+        ("state", "state", _str_value),
+        ("zipCode", "zip_code", _str_value),
+        ("fullAddress", "full_address", _str_value),
+    ],
+    "property": [
+        ("propertyType", "property_type", _str_value),
+        ("style", "style", _str_value),
+        ("beds", "beds", _int_value),
+        ("baths", "baths", _float_value),
+        ("sqft", "sqft", _int_value),
+        ("lotSqft", "lot_sqft", _int_value),
+        ("yearBuilt", "year_built", _int_value),
+        ("stories", "stories", _int_value),
+        ("parkingGarage", "parking_garage", _int_value),
+    ],
+    "pricing": [
+        ("listPrice", "list_price", _int_value),
+        ("soldPrice", "sold_price", _int_value),
+        ("pricePerSqft", "price_per_sqft", _int_value),
+        ("estimatedValue", "estimated_value", _int_value),
+        ("taxAssessedValue", "tax_assessed_value", _int_value),
+    ],
+    "listing": [
+        ("status", "status", _str_value),
+        ("listDate", "list_date", _str_value),
+        ("soldDate", "sold_date", _str_value),
+        ("lastSoldDate", "last_sold_date", _str_value),
+        ("daysOnMls", "days_on_mls", _int_value),
+        ("mlsId", "mls_id", _str_value),
+        ("mlsNumber", "mls", _str_value),
+    ],
+    "agent": [
+        ("name", "agent_name", _str_value),
+        ("phone", "agent_phone", _str_value),
+        ("email", "agent_email", _str_value),
+    ],
+    "broker": [
+        ("name", "broker_name", _str_value),
+        ("phone", "broker_phone", _str_value),
+    ],
+    "hoa": [
+        ("fee", "hoa_fee", _int_value),
+    ],
+    "location": [
+        ("latitude", "latitude", _float_value),
+        ("longitude", "longitude", _float_value),
+        ("neighborhoods", "neighborhoods", _str_value),
+    ],
+}
+
+
+def _compile_lookup_builder(schema):
+    """
+    Generate `build(prop)` returning the nested lookup dict as one straight-line literal,
+    so per-call work is just the coercer calls (no loops over the schema). The coercers
+    are bound as default arguments, which makes them fast locals.
+    """
+    coercers = {coerce.__name__: coerce for fields in schema.values() for _, _, coerce in fields}
+    sections = []
+    for section, fields in schema.items():
+        entries = ", ".join(f"{key!r}: {coerce.__name__}(prop, {column!r})" for key, column, coerce in fields)
+        sections.append(f"        {section!r}: {{{entries}}},")
+    params = ", ".join(f"{name}={name}" for name in coercers)
+    source = f"def build(prop, {params}):\n    return {{\n" + "\n".join(sections) + "\n    }\n"
+    namespace = dict(coercers)
+    exec(compile(source, "<lookup schema>", "exec"), namespace)
+    return namespace["build"]
+
+
+_build_lookup_data = _compile_lookup_builder(LOOKUP_SCHEMA)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """
+    Shared scrape executor, created on first use so commands that never scrape
+    don't start threads.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="hh")
+                atexit.register(_executor.shutdown, wait=False)
+    return _executor
+
+
+# Scrapes are memoized by arguments: a retry joins the attempt that is still running
+# (e.g. after our timeout fired) and a retry shortly after success reuses its result.
+RECENT_SCRAPE_TTL_SECONDS = 60
+_inflight_scrapes = {}  # (location, listing_type, extra_property_data) -> Future
+_recent_scrapes = {}  # same key -> (expires_at, DataFrame)
+_scrape_lock = threading.Lock()
+
+
+def _finish_scrape(key, future):
+    with _scrape_lock:
+        if _inflight_scrapes.get(key) is future:
+            del _inflight_scrapes[key]
+        if future.exception() is None:
+            now = time.monotonic()
+            for stale in [k for k, (expires_at, _) in _recent_scrapes.items() if expires_at <= now]:
+                del _recent_scrapes[stale]
+            _recent_scrapes[key] = (now + RECENT_SCRAPE_TTL_SECONDS, future.result())
+
+
+def _recent_or_inflight(key):
+    """Cached result (found, value) or the running future for key, under the lock."""
+    with _scrape_lock:
+        recent = _recent_scrapes.get(key)
+        if recent is not None and recent[0] > time.monotonic():
+            return True, recent[1]
+        return False, _inflight_scrapes.get(key)
+
 
-def scrape_with_timeout(location: str, listing_type=None, extra_property_data: bool = True, timeout_seconds: int = SCRAPE_TIMEOUT_SECONDS):
+def scrape_with_timeout(location: str, listing_type=None, extra_property_data: bool = True, timeout_seconds: int = SCRAPE_TIMEOUT_SECONDS, deadline: float = None):
     """
     Scrape property with a timeout to prevent hanging.
+    With a time.monotonic() deadline, waiting for a rate-limit slot and for the
+    scrape itself both stop at the deadline (RateLimitExceeded / TimeoutError).
+    A timed-out scrape keeps running in the background; we stop waiting for it
+    instead of blocking on executor shutdown, and the next attempt with the same
+    arguments waits on it rather than starting a duplicate request.
     """
-    with ThreadPoolExecutor(max_workers=1) as executor:
-        future = executor.submit(
-            scrape_property,
-            location=location,
-            listing_type=listing_type,
-            extra_property_data=extra_property_data,
-        )
-        try:
-            return future.result(timeout=timeout_seconds)
-        except FuturesTimeoutError:
-            raise TimeoutError(f"Scrape timed out after {timeout_seconds}s")
+    key = (location, listing_type, extra_property_data)
+    found, future = _recent_or_inflight(key)
+    if found:
+        return future
+    
+    if future is None:
+        # homeharvest pulls in its HTTP and parsing stack; import it only when we actually scrape
+        from homeharvest import scrape_property
+        
+        max_wait = None if deadline is None else max(0.0, deadline - time.monotonic())
+        admit("realtor", REALTOR_REQUESTS_PER_MINUTE, max_wait=max_wait)
+        submitted = False
+        with _scrape_lock:
+            future = _inflight_scrapes.get(key)
+            if future is None:
+                future = _get_executor().submit(
+                    scrape_property,
+                    location=location,
+                    listing_type=listing_type,
+                    extra_property_data=extra_property_data,
+                )
+                _inflight_scrapes[key] = future
+                submitted = True
+        # Outside the lock: an already-finished future runs the callback inline, and
+        # _finish_scrape takes the lock itself
+        if submitted:
+            future.add_done_callback(lambda f: _finish_scrape(key, f))
+    
+    if deadline is not None:
+        timeout_seconds = max(1, min(timeout_seconds, deadline - time.monotonic()))
+    try:
+        return future.result(timeout=timeout_seconds)
+    except FuturesTimeoutError:
+        raise TimeoutError(f"Scrape timed out after {timeout_seconds:.0f}s")
+
+
+def _retry_after_seconds(error: Exception):
+    """Seconds requested by a Retry-After header on the error's HTTP response, if any."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    value = headers.get("Retry-After") if headers else None
+    if not value:
+        return None
+    
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def _backoff_seconds(retries: int, error: Exception) -> float:
+    """
+    Exponential backoff with 0.5x-1.0x jitter so concurrent workers don't retry
+    in lockstep. A server-provided Retry-After takes precedence.
+    """
+    retry_after = _retry_after_seconds(error)
+    if retry_after is not None:
+        return retry_after
+    delay = min(RETRY_MAX_DELAY_SECONDS, (2 ** retries) * RETRY_BASE_DELAY_SECONDS)
+    return delay * random.uniform(0.5, 1.0)
 
 
 def scrape_with_retry(location: str, listing_type=None, extra_property_data: bool = True, max_retries: int = 3):
     """
     Scrape property with retry logic for rate limiting (429 errors).
-    Uses exponential backoff between retries.
+    Uses jittered exponential backoff between retries, bounded by RETRY_BUDGET_SECONDS
+    of wall-clock time overall.
     """
+    deadline = time.monotonic() + RETRY_BUDGET_SECONDS
     retries = 0
     last_error = None
     
@@ -49,14 +273,14 @@ def scrape_with_retry(location: str, listing_type=None, extra_property_data: boo
                 location=location,
                 listing_type=listing_type,
                 extra_property_data=extra_property_data,
-                timeout_seconds=SCRAPE_TIMEOUT_SECONDS,
+                deadline=deadline,
             )
+        except RateLimitExceeded as e:
+            # Our own per-minute cap won't free up before the budget runs out; retrying can't help
+            raise Exception(f"Too many Realtor.com lookups in the last minute ({e}). Try again shortly.")
         except TimeoutError as e:
             # Timeout - likely rate limited or blocked
-            wait_time = (2 ** retries) * 3  # 3s, 6s, 12s
-            print(f"Timeout. Waiting {wait_time}s before retry {retries + 1}/{max_retries}", file=sys.stderr)
-            time.sleep(wait_time)
-            retries += 1
+            reason = "Timeout"
             last_error = e
         except Exception as e:
             error_str = str(e).lower()
@@ -64,13 +288,21 @@ def scrape_with_retry(location: str, listing_type=None, extra_property_data: boo
             
             # Check for rate limit or auth errors
             if "429" in error_str or "forbidden" in error_str or "authentication" in error_str or "too many" in error_str:
-                wait_time = (2 ** retries) * 3  # 3s, 6s, 12s
-                print(f"Rate limited. Waiting {wait_time}s before retry {retries + 1}/{max_retries}", file=sys.stderr)
-                time.sleep(wait_time)
-                retries += 1
+                reason = "Rate limited"
             else:
                 # Non-rate-limit error, don't retry
                 raise e
+        
+        retries += 1
+        if retries >= max_retries:
+            break
+        
+        wait_time = _backoff_seconds(retries - 1, last_error)
+        if time.monotonic() + wait_time >= deadline:
+            print(f"{reason}. Retry budget of {RETRY_BUDGET_SECONDS}s exhausted", file=sys.stderr)
+            break
+        print(f"{reason}. Waiting {wait_time:.1f}s before retry {retries}/{max_retries - 1}", file=sys.stderr)
+        time.sleep(wait_time)
     
     # All retries exhausted - provide helpful error message
     if isinstance(last_error, TimeoutError):
@@ -94,66 +326,15 @@ def lookup_property_by_address(address: str) -> dict:
         if properties.empty:
             return {"success": False, "error": "No property found", "data": None}
         
-        prop = properties.iloc[0]
-        
-        result = {
-            "success": True,
-            "data": {
-                "address": {
-                    "street": str(prop.get("street_address", "") or ""),
-                    "city": str(prop.get("city", "") or ""),
-                    "state": str(prop.get("state", "") or ""),
-                    "zipCode": str(prop.get("zip_code", "") or ""),
-                    "fullAddress": str(prop.get("full_address", "") or address),
-                },
-                "property": {
-                    "propertyType": str(prop.get("property_type", "") or ""),
-                    "style": str(prop.get("style", "") or ""),
-                    "beds": int(prop.get("beds", 0) or 0) if prop.get("beds") else None,
-                    "baths": float(prop.get("baths", 0) or 0) if prop.get("baths") else None,
-                    "sqft": int(prop.get("sqft", 0) or 0) if prop.get("sqft") else None,
-                    "lotSqft": int(prop.get("lot_sqft", 0) or 0) if prop.get("lot_sqft") else None,
-                    "yearBuilt": int(prop.get("year_built", 0) or 0) if prop.get("year_built") else None,
-                    "stories": int(prop.get("stories", 0) or 0) if prop.get("stories") else None,
-                    "parkingGarage": int(prop.get("parking_garage", 0) or 0) if prop.get("parking_garage") else None,
-                },
-                "pricing": {
-                    "listPrice": int(prop.get("list_price", 0) or 0) if prop.get("list_price") else None,
-                    "soldPrice": int(prop.get("sold_price", 0) or 0) if prop.get("sold_price") else None,
-                    "pricePerSqft": int(prop.get("price_per_sqft", 0) or 0) if prop.get("price_per_sqft") else None,
-                    "estimatedValue": int(prop.get("estimated_value", 0) or 0) if prop.get("estimated_value") else None,
-                    "taxAssessedValue": int(prop.get("tax_assessed_value", 0) or 0) if prop.get("tax_assessed_value") else None,
-                },
-                "listing": {
-                    "status": str(prop.get("status", "") or ""),
-                    "listDate": str(prop.get("list_date", "") or ""),
-                    "soldDate": str(prop.get("sold_date", "") or ""),
-                    "lastSoldDate": str(prop.get("last_sold_date", "") or ""),
-                    "daysOnMls": int(prop.get("days_on_mls", 0) or 0) if prop.get("days_on_mls") else None,
-                    "mlsId": str(prop.get("mls_id", "") or ""),
-                    "mlsNumber": str(prop.get("mls", "") or ""),
-                },
-                "agent": {
-                    "name": str(prop.get("agent_name", "") or ""),
-                    "phone": str(prop.get("agent_phone", "") or ""),
-                    "email": str(prop.get("agent_email", "") or ""),
-                },
-                "broker": {
-                    "name": str(prop.get("broker_name", "") or ""),
-                    "phone": str(prop.get("broker_phone", "") or ""),
-                },
-                "hoa": {
-                    "fee": int(prop.get("hoa_fee", 0) or 0) if prop.get("hoa_fee") else None,
-                },
-                "location": {
-                    "latitude": float(prop.get("latitude", 0) or 0) if prop.get("latitude") else None,
-                    "longitude": float(prop.get("longitude", 0) or 0) if prop.get("longitude") else None,
-                    "neighborhoods": str(prop.get("neighborhoods", "") or ""),
-                },
-                "source": "homeharvest",
-                "propertyUrl": str(prop.get("property_url", "") or ""),
-            }
-        }
+        # Plain dict: each field read below is a hash lookup rather than Series label indexing
+        prop = properties.iloc[0].to_dict()
+        
+        data = _build_lookup_data(prop)
+        data["address"]["fullAddress"] = data["address"]["fullAddress"] or address
+        data["source"] = "homeharvest"
+        data["propertyUrl"] = _str_value(prop, "property_url")
+        
+        result = {"success": True, "data": data}
         
         return result
         
@@ -161,6 +342,30 @@ def lookup_property_by_address(address: str) -> dict:
         return {"success": False, "error": str(e), "data": None}
 
 
+# Search result rows: [(response key, HomeHarvest column, coercer)], same coercers as LOOKUP_SCHEMA.
+# The search path applies them column-wise, so only the column type lists are derived here.
+SEARCH_SCHEMA = [
+    ("address", "full_address", _str_value),
+    ("street", "street_address", _str_value),
+    ("city", "city", _str_value),
+    ("state", "state", _str_value),
+    ("zipCode", "zip_code", _str_value),
+    ("propertyType", "property_type", _str_value),
+    ("beds", "beds", _int_value),
+    ("baths", "baths", _float_value),
+    ("sqft", "sqft", _int_value),
+    ("listPrice", "list_price", _int_value),
+    ("status", "status", _str_value),
+    ("yearBuilt", "year_built", _int_value),
+    ("latitude", "latitude", _float_value),
+    ("longitude", "longitude", _float_value),
+]
+SEARCH_COLUMNS = {column: key for key, column, _ in SEARCH_SCHEMA}
+SEARCH_INT_COLUMNS = [column for _, column, coerce in SEARCH_SCHEMA if coerce is _int_value]
+SEARCH_FLOAT_COLUMNS = [column for _, column, coerce in SEARCH_SCHEMA if coerce is _float_value]
+SEARCH_STR_COLUMNS = [column for _, column, coerce in SEARCH_SCHEMA if coerce is _str_value]
+
+
 def search_properties_by_location(location: str, listing_type: str = "for_sale", limit: int = 10) -> dict:
     """
     Search for properties in a location (city, zip code, etc.)
@@ -186,24 +391,18 @@ def search_properties_by_location(location: str, listing_type: str = "for_sale",
         if properties.empty:
             return {"success": True, "data": [], "count": 0}
         
-        results = []
-        for _, prop in properties.head(limit).iterrows():
-            results.append({
-                "address": str(prop.get("full_address", "") or ""),
-                "street": str(prop.get("street_address", "") or ""),
-                "city": str(prop.get("city", "") or ""),
-                "state": str(prop.get("state", "") or ""),
-                "zipCode": str(prop.get("zip_code", "") or ""),
-                "propertyType": str(prop.get("property_type", "") or ""),
-                "beds": int(prop.get("beds", 0) or 0) if prop.get("beds") else None,
-                "baths": float(prop.get("baths", 0) or 0) if prop.get("baths") else None,
-                "sqft": int(prop.get("sqft", 0) or 0) if prop.get("sqft") else None,
-                "listPrice": int(prop.get("list_price", 0) or 0) if prop.get("list_price") else None,
-                "status": str(prop.get("status", "") or ""),
-                "yearBuilt": int(prop.get("year_built", 0) or 0) if prop.get("year_built") else None,
-                "latitude": float(prop.get("latitude", 0) or 0) if prop.get("latitude") else None,
-                "longitude": float(prop.get("longitude", 0) or 0) if prop.get("longitude") else None,
-            })
+        # Cast column-wise instead of per row; missing columns come back as NaN
+        df = properties.head(limit).reindex(columns=list(SEARCH_COLUMNS))
+        numeric_columns = SEARCH_INT_COLUMNS + SEARCH_FLOAT_COLUMNS
+        numeric = df[numeric_columns].apply(pd.to_numeric, errors="coerce")
+        numeric = numeric.where(numeric != 0)  # 0 is reported as missing, as before
+        df[SEARCH_INT_COLUMNS] = np.trunc(numeric[SEARCH_INT_COLUMNS]).astype("Int64")
+        df[SEARCH_FLOAT_COLUMNS] = numeric[SEARCH_FLOAT_COLUMNS].astype("Float64")
+        strings = df[SEARCH_STR_COLUMNS]
+        df[SEARCH_STR_COLUMNS] = strings.where(strings.notna() & (strings != ""), "").astype(str)
+        
+        df = df.astype(object).where(df.notna(), None)
+        results = df.rename(columns=SEARCH_COLUMNS).to_dict(orient="records")
         
         return {"success": True, "data": results, "count": len(results)}
         
@@ -211,23 +410,23 @@ def search_properties_by_location(location: str, listing_type: str = "for_sale",
         return {"success": False, "error": str(e), "data": [], "count": 0}
 
 
-if __name__ == "__main__":
-    if len(sys.argv) < 3:
-        print(json.dumps({"success": False, "error": "Usage: homeharvest_lookup.py <command> <args>"}))
-        sys.exit(1)
+def run_command(args: list) -> dict:
+    """Run one command given CLI-style arguments and return the result dict."""
+    if len(args) < 2:
+        raise UsageError("Usage: homeharvest_lookup.py <command> <args>")
     
-    command = sys.argv[1]
+    command = args[0]
     
     if command == "lookup":
-        address = sys.argv[2]
-        result = lookup_property_by_address(address)
-        print(json.dumps(result))
+        address = args[1]
+        return lookup_property_by_address(address)
     elif command == "search":
-        location = sys.argv[2]
-        listing_type = sys.argv[3] if len(sys.argv) > 3 else "for_sale"
-        limit = int(sys.argv[4]) if len(sys.argv) > 4 else 10
-        result = search_properties_by_location(location, listing_type, limit)
-        print(json.dumps(result))
-    else:
-        print(json.dumps({"success": False, "error": f"Unknown command: {command}"}))
-        sys.exit(1)
+        location = args[1]
+        listing_type = args[2] if len(args) > 2 else "for_sale"
+        limit = int(args[3]) if len(args) > 3 else 10
+        return search_properties_by_location(location, listing_type, limit)
+    raise UsageError(f"Unknown command: {command}")
+
+
+if __name__ == "__main__":
+    run_main(run_command)
@@ -0,0 +1,20 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP session for the lookup scripts' third-party API clients.
+"""
+
+
+def pooled_session():
+    """
+    requests.Session that keeps HTTPS connections alive between lookups.
+    Client libraries that call the module-level requests.get() for every request open
+    a new connection each time; patching their `requests` name with this session
+    routes those calls through one connection pool instead.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+    
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=8, pool_maxsize=32, max_retries=0)
+    session.mount('https://', adapter)
+    return session
@@ -4,19 +4,39 @@ OpenCorporates lookup using the opyncorporates Python wrapper.
 Provides company search, company fetch, and officer lookup functionality.
 """
 
-import json
-import sys
 import os
 import re
+import functools
+from concurrent.futures import ThreadPoolExecutor
 
-try:
-    from opyncorporates import create_engine
-except ImportError:
-    print(json.dumps({
-        'success': False,
-        'error': 'opyncorporates library not installed. Run: pip install opyncorporates',
-    }))
-    sys.exit(1)
+from http_session import pooled_session
+from rate_limit import admit
+from result_cache import ResultCache
+from worker_io import UsageError, run_main
+
+
+# Successful API results are cached on disk; failures are always retried
+SEARCH_CACHE_TTL_SECONDS = 60 * 60
+COMPANY_CACHE_TTL_SECONDS = 24 * 60 * 60
+_cache = ResultCache('opencorporates')
+
+# Per-worker share of the OpenCorporates quota, enforced by rate_limit.admit
+OPENCORPORATES_REQUESTS_PER_MINUTE = 30
+# search_companies_detailed fetches details for at most this many hits, so one search
+# (2 search GETs + DETAIL_FETCH_LIMIT fetches) stays well inside the per-minute cap above
+DETAIL_FETCH_LIMIT = 10
+DETAIL_FETCH_WORKERS = 8
+
+
+OPYNCORPORATES_NOT_INSTALLED_ERROR = 'opyncorporates library not installed. Run: pip install opyncorporates'
+
+
+_SINGLE_LETTER_RUN_RE = re.compile(r'\b(?:[A-Z]\s+)+[A-Z]\b', re.IGNORECASE)
+_WS_RE = re.compile(r'\s+')
+
+
+def _join_letters(match):
+    return _WS_RE.sub('', match.group(0))
 
 
 def normalize_search_query(query):
@@ -24,16 +44,25 @@ def normalize_search_query(query):
     Normalize spaced letter sequences for better search matching.
     Examples: "JOHNSTON JAKE L L C" -> "JOHNSTON JAKE LLC"
     """
-    normalized = query.replace('.', '')
-    normalized = re.sub(r'\b([A-Z])\s+([A-Z])\s+([A-Z])\s+([A-Z])\b', r'\1\2\3\4', normalized, flags=re.IGNORECASE)
-    normalized = re.sub(r'\b([A-Z])\s+([A-Z])\s+([A-Z])\b', r'\1\2\3', normalized, flags=re.IGNORECASE)
-    normalized = re.sub(r'\b([A-Z])\s+([A-Z])\b', r'\1\2', normalized, flags=re.IGNORECASE)
-    normalized = re.sub(r'\s+', ' ', normalized).strip()
-    return normalized
+    normalized = _SINGLE_LETTER_RUN_RE.sub(_join_letters, query.replace('.', ''))
+    return _WS_RE.sub(' ', normalized).strip()
 
 
+@functools.lru_cache(maxsize=1)
 def get_engine():
-    """Create OpenCorporates engine with optional API token"""
+    """
+    Create OpenCorporates engine with optional API token (one per process).
+    opyncorporates is imported here so cached lookups and usage errors don't pay for it.
+    """
+    try:
+        import opyncorporates.api as opyncorporates_api
+        from opyncorporates import create_engine
+    except ImportError:
+        raise RuntimeError(OPYNCORPORATES_NOT_INSTALLED_ERROR)
+    
+    # Replace opyncorporates.api's `requests` module with a pooled session
+    opyncorporates_api.requests = pooled_session()
+    
     api_token = os.environ.get('OPENCORPORATES_API_KEY')
     
     if api_token:
@@ -42,6 +71,50 @@ def get_engine():
         return create_engine(api_version='0.4')
 
 
+# Placeholder words commonly returned by OpenCorporates instead of a name; matched as whole
+# tokens so e.g. "none" doesn't reject "Nonesuch"
+GARBAGE_TOKENS = frozenset({
+    'n/a',
+    'none',
+    'unknown',
+    'unknowns',
+    'various',
+    'multiple',
+    'multiples',
+    'pending',
+    'nominee',
+    'nominees',
+})
+_TOKEN_RE = re.compile(r'[\w/]+')
+
+# Placeholder phrases, matched anywhere in the name
+GARBAGE_PHRASES = (
+    'positions include',
+    'information on file',
+    'see document',
+    'refer to',
+    'available upon request',
+    'not available',
+    'as per',
+    'listed in',
+    'filed with',
+    'registered agent',
+    'same as',
+    'see above',
+    'see below',
+    'to be updated',
+    'the company',
+    'this company',
+    'corporate officer',
+    'director services',
+    'designated agent',
+)
+_GARBAGE_PHRASE_RE = re.compile('|'.join(re.escape(p) for p in GARBAGE_PHRASES))
+
+DESCRIPTION_STARTERS = ('the', 'a', 'an', 'as', 'per', 'see', 'for')
+_DESCRIPTION_STARTER_RE = re.compile('(?:' + '|'.join(DESCRIPTION_STARTERS) + ') ')
+
+
 def is_valid_officer_name(name):
     """
     Filter out garbage/placeholder entries from OpenCorporates.
@@ -49,52 +122,27 @@ def is_valid_officer_name(name):
     """
     if not name or not isinstance(name, str):
         return False
-    
+    return _is_valid_name_text(name)
+
+
+# Registered agents and officers repeat heavily across search and company results
+@functools.lru_cache(maxsize=4096)
+def _is_valid_name_text(name):
     name_lower = name.lower().strip()
     
     # Skip empty or very short names
     if len(name_lower) < 2:
         return False
     
-    # List of garbage patterns commonly returned by OpenCorporates
-    garbage_patterns = [
-        'positions include',
-        'information on file',
-        'see document',
-        'refer to',
-        'available upon request',
-        'not available',
-        'n/a',
-        'none',
-        'unknown',
-        'various',
-        'multiple',
-        'as per',
-        'listed in',
-        'filed with',
-        'registered agent',
-        'same as',
-        'see above',
-        'see below',
-        'to be updated',
-        'pending',
-        'the company',
-        'this company',
-        'corporate officer',
-        'director services',
-        'nominee',
-        'designated agent',
-    ]
+    if not GARBAGE_TOKENS.isdisjoint(_TOKEN_RE.findall(name_lower)):
+        return False
     
-    for pattern in garbage_patterns:
-        if pattern in name_lower:
-            return False
+    if _GARBAGE_PHRASE_RE.search(name_lower):
+        return False
     
     # Skip if it looks like a description rather than a name (starts with articles/prepositions)
-    description_starters = ['the ', 'a ', 'an ', 'as ', 'per ', 'see ', 'for ']
-    for starter in description_starters:
-        if name_lower.startswith(starter):
-            return False
+    if _DESCRIPTION_STARTER_RE.match(name_lower):
+        return False
     
     return True
 
@@ -146,8 +194,7 @@ def parse_company(company_data):
         }
     
     branch = None
-    if company_data.get('branch') and isinstance(company_data['branch'], dict):
-        branch_data = company_data['branch']
+    if (branch_data := company_data.get('branch')) and isinstance(branch_data, dict):
         branch = {
             'parentCompanyNumber': str(branch_data.get('company_number', '')),
             'parentJurisdictionCode': str(branch_data.get('jurisdiction_code', '')),
@@ -156,24 +203,24 @@ def parse_company(company_data):
         }
     
     officers = []
-    if company_data.get('officers') and isinstance(company_data['officers'], list):
-        for o in company_data['officers']:
+    if (raw_officers := company_data.get('officers')) and isinstance(raw_officers, list):
+        for o in raw_officers:
             if isinstance(o, dict):
-                officer = o.get('officer', o) if 'officer' in o else o
+                officer = o.get('officer', o)
                 officer_name = officer.get('name', '') if isinstance(officer, dict) else ''
                 if is_valid_officer_name(officer_name):
                     officers.append(parse_officer(officer))
     
     filings = []
-    if company_data.get('filings') and isinstance(company_data['filings'], list):
-        for f in company_data['filings']:
+    if (raw_filings := company_data.get('filings')) and isinstance(raw_filings, list):
+        for f in raw_filings:
             if isinstance(f, dict):
-                filing = f.get('filing', f) if 'filing' in f else f
+                filing = f.get('filing', f)
                 filings.append(parse_filing(filing))
     
     previous_names = []
-    if company_data.get('previous_names') and isinstance(company_data['previous_names'], list):
-        for pn in company_data['previous_names']:
+    if (raw_previous_names := company_data.get('previous_names')) and isinstance(raw_previous_names, list):
+        for pn in raw_previous_names:
             if isinstance(pn, dict):
                 previous_names.append(str(pn.get('company_name', '')))
             else:
@@ -217,15 +264,22 @@ def search_companies(query, jurisdiction=None, per_page=30):
     """
     normalized_query = normalize_search_query(query)
     
+    cache_key = _cache.make_key('search_companies', query, jurisdiction, per_page)
+    cached = _cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
     try:
         engine = get_engine()
+        admit('opencorporates', OPENCORPORATES_REQUESTS_PER_MINUTE)
         
         search_args = {'q': normalized_query, 'per_page': per_page}
         if jurisdiction:
             search_args['jurisdiction_code'] = jurisdiction
         
+        # SearchRequest GETs the query on construction and get_page() GETs it again
         search = engine.search('companies', **search_args)
-        
+        admit('opencorporates', OPENCORPORATES_REQUESTS_PER_MINUTE)
         results = search.get_page(1)
         
         companies = []
@@ -234,7 +288,7 @@ def search_companies(query, jurisdiction=None, per_page=30):
                 company_data = item.get('company', item) if isinstance(item, dict) else item
                 companies.append(parse_company(company_data))
         
-        return {
+        result = {
             'success': True,
             'companies': companies,
             'totalCount': getattr(search, 'total_count', len(companies)),
@@ -242,6 +296,8 @@ def search_companies(query, jurisdiction=None, per_page=30):
             'query': query,
             'normalizedQuery': normalized_query,
         }
+        _cache.set(cache_key, result, SEARCH_CACHE_TTL_SECONDS)
+        return result
         
     except Exception as e:
         return {
@@ -253,19 +309,43 @@ def search_companies(query, jurisdiction=None, per_page=30):
         }
 
 
+def search_companies_detailed(query, jurisdiction=None, per_page=30, max_details=DETAIL_FETCH_LIMIT):
+    """
+    Search for companies by name, then fetch full details for the first `max_details`
+    hits in parallel. Remaining hits, and hits whose detail fetch fails, keep their
+    search-result data.
+    """
+    result = search_companies(query, jurisdiction, per_page)
+    if not result['success'] or not result['companies']:
+        return result
+    
+    def fetch_detail(company):
+        detail = get_company(company['jurisdictionCode'], company['companyNumber'])
+        return detail['company'] if detail['success'] else company
+    
+    hits = result['companies']
+    with ThreadPoolExecutor(max_workers=DETAIL_FETCH_WORKERS) as executor:
+        detailed = list(executor.map(fetch_detail, hits[:max_details]))
+    companies = detailed + hits[max_details:]
+    
+    return {**result, 'companies': companies}
+
+
 def search_officers(name, jurisdiction=None, per_page=30):
     """
     Search for corporate officers by name.
     """
     try:
         engine = get_engine()
+        admit('opencorporates', OPENCORPORATES_REQUESTS_PER_MINUTE)
         
         search_args = {'q': name, 'per_page': per_page}
         if jurisdiction:
             search_args['jurisdiction_code'] = jurisdiction
         
+        # SearchRequest GETs the query on construction and get_page() GETs it again
         search = engine.search('officers', **search_args)
-        
+        admit('opencorporates', OPENCORPORATES_REQUESTS_PER_MINUTE)
         results = search.get_page(1)
         
         officers = []
@@ -307,8 +387,14 @@ def get_company(jurisdiction_code, company_number):
     """
     Fetch detailed company information by jurisdiction and company number.
     """
+    cache_key = _cache.make_key('get_company', jurisdiction_code, company_number)
+    cached = _cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
     try:
         engine = get_engine()
+        admit('opencorporates', OPENCORPORATES_REQUESTS_PER_MINUTE)
         
         fetch = engine.fetch('companies', jurisdiction_code, company_number)
         
@@ -321,10 +407,12 @@ def get_company(jurisdiction_code, company_number):
         
         company = parse_company(fetch.results)
         
-        return {
+        result = {
             'success': True,
             'company': company,
         }
+        _cache.set(cache_key, result, COMPANY_CACHE_TTL_SECONDS)
+        return result
         
     except Exception as e:
         return {
@@ -334,51 +422,41 @@ def get_company(jurisdiction_code, company_number):
         }
 
 
-def main():
-    if len(sys.argv) < 2:
-        print(json.dumps({
-            'success': False,
-            'error': 'Usage: python opencorporates_lookup.py <command> [args]',
-        }))
-        sys.exit(1)
+def run_command(args):
+    """Run one command given CLI-style arguments and return the result dict."""
+    if len(args) < 1:
+        raise UsageError('Usage: python opencorporates_lookup.py <command> [args]')
     
-    command = sys.argv[1]
+    command = args[0]
     
-    try:
-        if command == 'search_companies':
-            if len(sys.argv) < 3:
-                print(json.dumps({'success': False, 'error': 'Missing query parameter'}))
-                sys.exit(1)
-            query = sys.argv[2]
-            jurisdiction = sys.argv[3] if len(sys.argv) > 3 else None
-            result = search_companies(query, jurisdiction)
-            print(json.dumps(result))
-            
-        elif command == 'search_officers':
-            if len(sys.argv) < 3:
-                print(json.dumps({'success': False, 'error': 'Missing name parameter'}))
-                sys.exit(1)
-            name = sys.argv[2]
-            jurisdiction = sys.argv[3] if len(sys.argv) > 3 else None
-            result = search_officers(name, jurisdiction)
-            print(json.dumps(result))
-            
-        elif command == 'get_company':
-            if len(sys.argv) < 4:
-                print(json.dumps({'success': False, 'error': 'Missing jurisdiction_code and company_number'}))
-                sys.exit(1)
-            jurisdiction_code = sys.argv[2]
-            company_number = sys.argv[3]
-            result = get_company(jurisdiction_code, company_number)
-            print(json.dumps(result))
-            
-        else:
-            print(json.dumps({'success': False, 'error': f'Unknown command: {command}'}))
-            sys.exit(1)
-            
-    except Exception as e:
-        print(json.dumps({'success': False, 'error': str(e)}))
-        sys.exit(1)
+    if command == 'search_companies':
+        if len(args) < 2:
+            raise UsageError('Missing query parameter')
+        jurisdiction = args[2] if len(args) > 2 else None
+        return search_companies(args[1], jurisdiction)
+    
+    elif command == 'search_companies_detailed':
+        if len(args) < 2:
+            raise UsageError('Missing query parameter')
+        jurisdiction = args[2] if len(args) > 2 else None
+        return search_companies_detailed(args[1], jurisdiction)
+    
+    elif command == 'search_officers':
+        if len(args) < 2:
+            raise UsageError('Missing name parameter')
+        jurisdiction = args[2] if len(args) > 2 else None
+        return search_officers(args[1], jurisdiction)
+    
+    elif command == 'get_company':
+        if len(args) < 3:
+            raise UsageError('Missing jurisdiction_code and company_number')
+        return get_company(args[1], args[2])
+    
+    raise UsageError(f'Unknown command: {command}')
+
+
+def main():
+    run_main(run_command, fatal=(Exception,))
 
 
 if __name__ == '__main__':
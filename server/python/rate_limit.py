@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Client-side fixed-window admission for the upstream APIs the lookup scripts call.
+Spreads bursts out locally so the retry/backoff paths only have to deal with the
+occasional real rate-limit response instead of being the primary throttle.
+"""
+
+import collections
+import threading
+import time
+
+_windows = collections.defaultdict(collections.deque)
+_lock = threading.Lock()
+
+
+class RateLimitExceeded(Exception):
+    """No request slot frees up within the time the caller is willing to wait."""
+
+
+def admit(host: str, limit: int = 30, window: float = 60.0, max_wait: float = None):
+    """
+    Block until another request to host fits within `limit` per `window` seconds.
+    With max_wait, raise RateLimitExceeded instead of sleeping longer than that.
+    """
+    deadline = None if max_wait is None else time.monotonic() + max_wait
+    while True:
+        with _lock:
+            now = time.monotonic()
+            sent = _windows[host]
+            while sent and sent[0] <= now - window:
+                sent.popleft()
+            if len(sent) < limit:
+                sent.append(now)
+                return
+            wait = sent[0] + window - now
+        if deadline is not None and now + wait > deadline:
+            raise RateLimitExceeded(
+                f"{host} request cap of {limit} per {window:g}s is full for another {wait:.1f}s"
+            )
+        time.sleep(wait)
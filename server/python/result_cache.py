@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Small SQLite-backed result cache shared by the lookup scripts.
+Keeps API responses on disk between worker processes and restarts so repeated
+lookups don't re-hit rate-limited upstream services.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# Per-user cache directory rather than the shared temp dir, where a predictable
+# file name could be pre-created or read by other local users
+DEFAULT_CACHE_DIR = os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'), 'freyja')
+DEFAULT_CACHE_PATH = os.path.join(DEFAULT_CACHE_DIR, 'lookup_cache.sqlite3')
+
+
+class ResultCache:
+    """
+    Key/value store of JSON results with a per-entry expiry.
+    Cache failures are never fatal: reads miss and writes are dropped.
+    """
+
+    def __init__(self, namespace, path=None):
+        self.namespace = namespace
+        self.path = path or os.environ.get('LOOKUP_CACHE_PATH') or DEFAULT_CACHE_PATH
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, mode=0o700, exist_ok=True)
+            # Create the file owner-only before SQLite opens it (SQLite would use the umask)
+            os.close(os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600))
+            conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS results ('
+                'key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)'
+            )
+            # Drop stale entries once per process so the file doesn't grow forever
+            conn.execute('DELETE FROM results WHERE expires_at < ?', (time.time(),))
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def make_key(self, *parts):
+        """Stable key for a call's arguments, scoped to this cache's namespace."""
+        payload = json.dumps([self.namespace, *parts], sort_keys=True, separators=(',', ':'))
+        return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+    def get(self, key):
+        """Cached value for key, or None if missing or expired."""
+        try:
+            with self._lock:
+                row = self._connection().execute(
+                    'SELECT value, expires_at FROM results WHERE key = ?', (key,)
+                ).fetchone()
+            if row is None or row[1] < time.time():
+                return None
+            return json.loads(row[0])
+        except (sqlite3.Error, OSError, ValueError):
+            # Unreadable cache or a corrupt row: treat as a miss
+            return None
+
+    def set(self, key, value, ttl):
+        """Store a JSON-serializable value for ttl seconds."""
+        try:
+            with self._lock:
+                conn = self._connection()
+                conn.execute(
+                    'INSERT OR REPLACE INTO results (key, value, expires_at) VALUES (?, ?, ?)',
+                    (key, json.dumps(value, separators=(',', ':')), time.time() + ttl),
+                )
+                conn.commit()
+        except (sqlite3.Error, OSError):
+            pass
@@ -4,18 +4,44 @@ USPS Address Validation using the official USPS Web Tools API.
 Uses the usps-api Python wrapper (Brobin/usps-api) for JSON responses.
 """
 
-import json
-import sys
 import os
+import re
+import functools
 
-try:
-    from usps import USPSApi, Address
-except ImportError:
-    print(json.dumps({
-        'success': False,
-        'error': 'usps-api package not installed. Run: pip install usps-api',
-    }))
-    sys.exit(1)
+from http_session import pooled_session
+from rate_limit import admit
+from result_cache import ResultCache
+from worker_io import UsageError, run_main
+
+
+# Address standardization is stable, so successful validations are cached for a month
+VALIDATION_CACHE_TTL_SECONDS = 30 * 24 * 60 * 60
+_cache = ResultCache('usps')
+
+# Per-worker cap on USPS Web Tools calls (see rate_limit)
+USPS_REQUESTS_PER_MINUTE = 60
+
+
+USPS_NOT_INSTALLED_ERROR = 'usps-api package not installed. Run: pip install usps-api'
+
+
+@functools.lru_cache(maxsize=1)
+def _usps():
+    """
+    Import usps-api on first use so `check` and cached lookups don't pay for it.
+    """
+    import usps
+    import usps.usps as usps_client
+    
+    # Replace usps.usps's `requests` module with a pooled session
+    usps_client.requests = pooled_session()
+    return usps
+
+
+@functools.lru_cache(maxsize=8)
+def get_usps_api(user_id: str):
+    """USPSApi client for a user id, reused across calls."""
+    return _usps().USPSApi(user_id, test=False)
 
 
 def validate_address(address_1: str, city: str, state: str, zipcode: str = '', address_2: str = '', name: str = ''):
@@ -31,8 +57,22 @@ def validate_address(address_1: str, city: str, state: str, zipcode: str = '', a
             'validated': None,
         }
     
+    cache_key = _cache.make_key('validate', address_1, city, state, zipcode, address_2, name)
+    cached = _cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
     try:
-        address = Address(
+        usps = _usps()
+    except ImportError:
+        return {
+            'success': False,
+            'error': USPS_NOT_INSTALLED_ERROR,
+            'validated': None,
+        }
+    
+    try:
+        address = usps.Address(
             name=name or '',
             address_1=address_1,
             address_2=address_2 or '',
@@ -41,8 +81,8 @@ def validate_address(address_1: str, city: str, state: str, zipcode: str = '', a
             zipcode=zipcode or '',
         )
         
-        usps = USPSApi(user_id, test=False)
-        validation = usps.validate_address(address)
+        admit('usps', USPS_REQUESTS_PER_MINUTE)
+        validation = get_usps_api(user_id).validate_address(address)
         result = validation.result
         
         # Check for errors in multiple possible envelope structures
@@ -74,17 +114,19 @@ def validate_address(address_1: str, city: str, state: str, zipcode: str = '', a
             }
         
         validated_address = address_data
+        zip5 = validated_address.get('Zip5', '')
+        zip4 = validated_address.get('Zip4', '')
         
-        return {
+        response = {
             'success': True,
             'validated': {
                 'address1': validated_address.get('Address2', ''),
                 'address2': validated_address.get('Address1', ''),
                 'city': validated_address.get('City', ''),
                 'state': validated_address.get('State', ''),
-                'zip5': validated_address.get('Zip5', ''),
-                'zip4': validated_address.get('Zip4', ''),
-                'zipFull': f"{validated_address.get('Zip5', '')}-{validated_address.get('Zip4', '')}" if validated_address.get('Zip4') else validated_address.get('Zip5', ''),
+                'zip5': zip5,
+                'zip4': zip4,
+                'zipFull': f"{zip5}-{zip4}" if zip4 else zip5,
                 'returnText': validated_address.get('ReturnText', ''),
                 'dpvConfirmation': validated_address.get('DPVConfirmation', ''),
                 'dpvFootnotes': validated_address.get('DPVFootnotes', ''),
@@ -97,6 +139,8 @@ def validate_address(address_1: str, city: str, state: str, zipcode: str = '', a
                 'zipcode': zipcode,
             },
         }
+        _cache.set(cache_key, response, VALIDATION_CACHE_TTL_SECONDS)
+        return response
         
     except Exception as e:
         return {
@@ -106,17 +150,20 @@ def validate_address(address_1: str, city: str, state: str, zipcode: str = '', a
         }
 
 
+_WS_RE = re.compile(r'\s+')
+_STATE_ZIP_RE = re.compile(r',?\s*([A-Z]{2})\s*(\d{5}(?:-\d{4})?)?$', re.IGNORECASE)
+_CITY_STREET_RE = re.compile(r'^(.+?)\s+([A-Za-z\s]+)$')
+_UNIT_RE = re.compile(r'\s+(APT|UNIT|STE|SUITE|#)\s*(\S+)$', re.IGNORECASE)
+
+
 def parse_full_address(full_address: str):
     """
     Parse a full address string and validate with USPS.
     Attempts to split the address into components first.
     """
-    import re
+    cleaned = _WS_RE.sub(' ', full_address.strip())
     
-    cleaned = re.sub(r'\s+', ' ', full_address.strip())
-    
-    state_zip_pattern = r',?\s*([A-Z]{2})\s*(\d{5}(?:-\d{4})?)?$'
-    match = re.search(state_zip_pattern, cleaned, re.IGNORECASE)
+    match = _STATE_ZIP_RE.search(cleaned)
     
     if not match:
         return {
@@ -135,8 +182,7 @@ def parse_full_address(full_address: str):
         city = parts[-1]
         street = ', '.join(parts[:-1])
     else:
-        city_street_pattern = r'^(.+?)\s+([A-Za-z\s]+)$'
-        cm = re.match(city_street_pattern, remaining)
+        cm = _CITY_STREET_RE.match(remaining)
         if cm:
             street = cm.group(1)
             city = cm.group(2)
@@ -147,8 +193,7 @@ def parse_full_address(full_address: str):
                 'validated': None,
             }
     
-    unit_pattern = r'\s+(APT|UNIT|STE|SUITE|#)\s*(\S+)$'
-    unit_match = re.search(unit_pattern, street, re.IGNORECASE)
+    unit_match = _UNIT_RE.search(street)
     address_2 = ''
     if unit_match:
         address_2 = f"{unit_match.group(1).upper()} {unit_match.group(2)}"
@@ -163,58 +208,37 @@ def parse_full_address(full_address: str):
     )
 
 
-def main():
-    if len(sys.argv) < 2:
-        print(json.dumps({
-            'success': False,
-            'error': 'Usage: python usps_lookup.py <command> [args...]',
-        }))
-        sys.exit(1)
+def run_command(args):
+    """Run one command given CLI-style arguments and return the result dict."""
+    if len(args) < 1:
+        raise UsageError('Usage: python usps_lookup.py <command> [args...]')
     
-    command = sys.argv[1]
+    command = args[0]
     
     if command == 'validate':
-        if len(sys.argv) < 5:
-            print(json.dumps({
-                'success': False,
-                'error': 'Usage: python usps_lookup.py validate <address1> <city> <state> [zipcode]',
-            }))
-            sys.exit(1)
-        
-        address_1 = sys.argv[2]
-        city = sys.argv[3]
-        state = sys.argv[4]
-        zipcode = sys.argv[5] if len(sys.argv) > 5 else ''
-        
-        result = validate_address(address_1, city, state, zipcode)
-        print(json.dumps(result))
-        
+        if len(args) < 4:
+            raise UsageError('Usage: python usps_lookup.py validate <address1> <city> <state> [zipcode]')
+        zipcode = args[4] if len(args) > 4 else ''
+        return validate_address(args[1], args[2], args[3], zipcode)
+    
     elif command == 'validate_full':
-        if len(sys.argv) < 3:
-            print(json.dumps({
-                'success': False,
-                'error': 'Usage: python usps_lookup.py validate_full "<full_address>"',
-            }))
-            sys.exit(1)
-        
-        full_address = sys.argv[2]
-        result = parse_full_address(full_address)
-        print(json.dumps(result))
-        
+        if len(args) < 2:
+            raise UsageError('Usage: python usps_lookup.py validate_full "<full_address>"')
+        return parse_full_address(args[1])
+    
     elif command == 'check':
         user_id = os.environ.get('USPS_USER_ID')
-        print(json.dumps({
+        return {
             'success': True,
             'configured': bool(user_id),
             'message': 'USPS API is configured' if user_id else 'USPS_USER_ID not set',
-        }))
-        
-    else:
-        print(json.dumps({
-            'success': False,
-            'error': f'Unknown command: {command}. Use: validate, validate_full, check',
-        }))
-        sys.exit(1)
+        }
+    
+    raise UsageError(f'Unknown command: {command}. Use: validate, validate_full, check')
+
+
+def main():
+    run_main(run_command)
 
 
 if __name__ == '__main__':
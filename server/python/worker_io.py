@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Stdin/stdout plumbing shared by the helper scripts Node runs through PythonWorkerPool.
+"""
+
+import json
+import sys
+
+
+def emit(obj):
+    """Write one compact JSON line to stdout as UTF-8 (non-ASCII names are not escaped)."""
+    line = json.dumps(obj, ensure_ascii=False, separators=(',', ':')) + '\n'
+    sys.stdout.flush()  # keep any text-layer output ahead of ours
+    sys.stdout.buffer.write(line.encode('utf-8', 'replace'))
+    sys.stdout.buffer.flush()
+
+
+class UsageError(Exception):
+    """Malformed command line or daemon request."""
+
+
+def serve(run_command, emit=emit):
+    """
+    Daemon mode: answer one JSON request per stdin line until EOF.
+    Requests look like {"id": 1, "args": [...]} where args is the script's CLI
+    argument list; responses are {"id": 1, "result": {...}} with the id echoed.
+    """
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get('id')
+            result = run_command(request.get('args', []))
+        except Exception as e:
+            result = {'success': False, 'error': str(e)}
+        emit({'id': request_id, 'result': result})
+
+
+def run_main(run_command, fatal=(UsageError,)):
+    """
+    CLI entry point: `--daemon` serves stdin, otherwise run sys.argv once.
+    Exceptions in `fatal` are reported as a JSON error with exit status 1.
+    """
+    if sys.argv[1:2] == ['--daemon']:
+        serve(run_command)
+        return
+
+    try:
+        result = run_command(sys.argv[1:])
+    except fatal as e:
+        emit({'success': False, 'error': str(e)})
+        sys.exit(1)
+
+    emit(result)